@@ -0,0 +1,66 @@
+import random
+import sys
+import time
+
+from powl.objects.BinaryRelation import BinaryRelation
+from powl.objects.utils.relation_backends import RelationBackend
+
+
+def random_partial_order_skeleton(n, density, seed):
+    rng = random.Random(seed)
+    edges = []
+    for i in range(n):
+        for j in range(i + 1, n):
+            if rng.random() < density:
+                edges.append((i, j))
+    return edges
+
+
+def build_relation(n, edges, backend):
+    relation = BinaryRelation(list(range(n)), backend=backend)
+    for i, j in edges:
+        relation.add_edge(i, j)
+    return relation
+
+
+def measure(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def benchmark(n, backend, density=0.05, seed=0):
+    edges = random_partial_order_skeleton(n, density, seed)
+    relation = build_relation(n, edges, backend)
+    closure = build_relation(n, edges, backend)
+
+    timings = {
+        "add_transitive_edges": measure(closure.add_transitive_edges),
+        "is_transitive": measure(closure.is_transitive),
+        "is_strict_partial_order": measure(closure.is_strict_partial_order),
+        "get_transitive_reduction": measure(closure.get_transitive_reduction),
+        "start/end nodes": measure(
+            lambda: (relation.get_start_nodes(), relation.get_end_nodes())
+        ),
+    }
+    return timings
+
+
+def execute_script(sizes=(25, 50, 100, 150, 200)):
+    print(f"{'n':>5} {'operation':<26} {'LIST [s]':>10} {'NUMPY [s]':>10} {'speedup':>9}")
+    for n in sizes:
+        list_timings = benchmark(n, RelationBackend.LIST)
+        numpy_timings = benchmark(n, RelationBackend.NUMPY)
+        for operation, list_time in list_timings.items():
+            numpy_time = numpy_timings[operation]
+            speedup = list_time / numpy_time if numpy_time > 0 else float("inf")
+            print(
+                f"{n:>5} {operation:<26} {list_time:>10.4f} {numpy_time:>10.4f} {speedup:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        execute_script(tuple(int(arg) for arg in sys.argv[1:]))
+    else:
+        execute_script()
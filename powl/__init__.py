@@ -1,3 +1,10 @@
+from powl.discovery.total_order_based.inductive.utils.budget import DiscoveryBudget
+from powl.discovery.total_order_based.inductive.utils.executor import (
+    DiscoveryExecutor,
+)
+from powl.discovery.total_order_based.inductive.utils.parallel_recursion import (
+    ParallelRecursion,
+)
 from powl.main import (
     convert_from_workflow_net,
     convert_to_bpmn,
@@ -8,6 +15,7 @@ from powl.main import (
     discover_petri_net_from_ocel,
     import_event_log,
     import_ocel,
+    import_variant_log,
     save_visualization,
     save_visualization_net,
     view,
@@ -14,6 +14,9 @@ from powl.discovery.dfg_based.variants.dfg_im_tree import DFGIMBasePOWL
 from powl.discovery.dfg_based.variants.im_dynamic_clustering_frequencies import (
     DFGPOWLInductiveMinerDynamicClusteringFrequency,
 )
+from powl.discovery.total_order_based.inductive.utils.executor import (
+    DiscoveryExecutor,
+)
 from powl.discovery.total_order_based.inductive.variants.powl_discovery_varaints import (
     POWLDiscoveryVariant,
 )
@@ -37,6 +40,7 @@ def apply(
     dfg: DFG,
     parameters: Optional[Dict[Any, Any]] = None,
     variant=POWLDiscoveryVariant.MAXIMAL,
+    executor: Optional[DiscoveryExecutor] = None,
 ) -> POWL:
     if parameters is None:
         parameters = {}
@@ -44,8 +48,11 @@ def apply(
     im_dfg = InductiveDFG(dfg=dfg, skip=False)
 
     algorithm = get_variant(variant)
-    im = algorithm(parameters)
-    res = im.apply(IMDataStructureDFG(im_dfg), parameters)
+    im = algorithm(parameters, executor=executor)
+    try:
+        res = im.apply(IMDataStructureDFG(im_dfg), parameters)
+    finally:
+        im.close()
     res = res.simplify()
 
     return res
@@ -21,6 +21,14 @@ class DFGIMBasePOWL(IMBasePOWL[T]):
         parameters: Optional[Dict[str, Any]] = None,
         second_iteration: bool = False,
     ) -> POWL:
+        return self._mine_within_budget(obj, parameters, second_iteration)
+
+    def _mine(
+        self,
+        obj: T,
+        parameters: Optional[Dict[str, Any]] = None,
+        second_iteration: bool = False,
+    ) -> POWL:
 
         empty_traces = self.empty_traces_cut().apply(obj, parameters)
         if empty_traces is not None:
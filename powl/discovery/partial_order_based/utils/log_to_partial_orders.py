@@ -1,10 +1,12 @@
 import warnings
-from bisect import bisect_left
 from collections import defaultdict
-from typing import Any, List, Set
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
 
+import numpy as np
 import pandas as pd
 
+from powl.discovery.partial_order_based.utils import simplified_objects
+
 from powl.discovery.partial_order_based.utils.constants import VARIANT_FREQUENCY_KEY
 from powl.discovery.partial_order_based.utils.simplified_objects import (
     ActivityInstance,
@@ -13,6 +15,49 @@ from powl.discovery.partial_order_based.utils.simplified_objects import (
 from powl.general_utils.time_utils import should_parse_column_as_date
 
 
+def _pair_fifo(group: np.ndarray, is_start: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs the start and complete events of every activity of every case first-in-first-out: a
+    complete event takes the earliest pending start of its activity, or is atomic if there is none.
+
+    If the i-th complete event of an activity (counting from 0) is preceded by s(i) start events
+    and p(i) starts were taken before it, it takes a start iff s(i) > p(i), and then the start
+    number p(i). As p(i + 1) = min(p(i) + 1, s(i)), p(i) - i is the minimum of 0 and s(j) - j - 1
+    over the previous complete events j, i.e. a cumulative minimum.
+
+    :param group: the id of the case and activity of every (start or complete) event, with the
+        events ordered by case and timestamp
+    :param is_start: whether every event is a start event
+    :return: the positions of the complete events, and of the events they start at (their own
+        position for atomic ones)
+    """
+    starts_before = (
+        pd.Series(is_start).groupby(group, sort=False).cumsum().to_numpy() - is_start
+    )
+    completes = np.flatnonzero(~is_start)
+    complete_groups = group[completes]
+    starts_before = starts_before[completes]
+    rank = pd.Series(complete_groups).groupby(complete_groups).cumcount().to_numpy()
+    previous_min = (
+        pd.Series(starts_before - rank - 1)
+        .groupby(complete_groups)
+        .cummin()
+        .groupby(complete_groups)
+        .shift(1, fill_value=0)
+        .to_numpy()
+    )
+    taken = rank + np.minimum(previous_min, 0)
+    paired = starts_before > taken
+
+    # the start events ordered by group: the n-th start of a group follows its first one
+    starts = np.flatnonzero(is_start)
+    starts = starts[np.argsort(group[starts], kind="stable")]
+    first_starts = np.searchsorted(group[starts], complete_groups)
+    start_positions = completes.copy()
+    start_positions[paired] = starts[first_starts[paired] + taken[paired]]
+    return completes, start_positions
+
+
 def generate_interval_df_fifo(
     df: pd.DataFrame,
     case_id_col: str,
@@ -22,69 +67,48 @@ def generate_interval_df_fifo(
     start_transitions: Set[str],
     complete_transitions: Set[str],
 ) -> pd.DataFrame:
+    """
+    :return: the activity intervals of the cases, with their activity (in the column ``activity``),
+        instance number (the number of the interval among the ones of its activity in its case, in
+        the column ``instance``) and start and end timestamps
+    """
 
     cols_to_keep = [case_id_col, activity_col, ordering_col]
     if lifecycle_col:
         cols_to_keep.append(lifecycle_col)
-    df_filtered = df[cols_to_keep].copy()
+    df_filtered = (
+        df[cols_to_keep].sort_values([case_id_col, ordering_col]).reset_index(drop=True)
+    )
 
     if lifecycle_col:
-        df_filtered = df_filtered.sort_values([case_id_col, ordering_col])
-
-        activity_col_idx = df_filtered.columns.get_loc(activity_col)
-        timestamp_col_idx = df_filtered.columns.get_loc(ordering_col)
-        lifecycle_col_idx = df_filtered.columns.get_loc(lifecycle_col)
-
-        all_intervals = []
-        grouped_by_case = df_filtered.groupby(case_id_col, sort=False)
-
-        for case_id, case_df in grouped_by_case:
-            pending_starts = defaultdict(list)
-            activity_instance_counter = defaultdict(int)
-
-            for event_tuple in case_df.itertuples(index=False, name=None):
-                activity_name = event_tuple[activity_col_idx]
-                timestamp = event_tuple[timestamp_col_idx]
-                lifecycle = event_tuple[lifecycle_col_idx]
-
-                if lifecycle in start_transitions:
-                    pending_starts[activity_name].append(timestamp)
-
-                elif lifecycle in complete_transitions:
-                    if pending_starts[activity_name]:
-                        start_timestamp = pending_starts[activity_name].pop(0)
-                    else:
-                        start_timestamp = timestamp
-                    activity_instance_counter[activity_name] += 1
-                    all_intervals.append(
-                        {
-                            case_id_col: case_id,
-                            "activity": ActivityInstance(
-                                activity_name, activity_instance_counter[activity_name]
-                            ),
-                            "start_timestamp": start_timestamp,
-                            "end_timestamp": timestamp,
-                        }
-                    )
-
-        interval_df = pd.DataFrame(all_intervals) if all_intervals else pd.DataFrame()
-
+        lifecycle = df_filtered[lifecycle_col]
+        is_start = lifecycle.isin(start_transitions).to_numpy()
+        # other transitions are ignored
+        relevant = is_start | lifecycle.isin(complete_transitions).to_numpy()
+        df_filtered = df_filtered[relevant].reset_index(drop=True)
+        is_start = is_start[relevant]
     else:
         # No lifecycle: each event is an atomic interval
-        df_filtered = df_filtered.sort_values([case_id_col, ordering_col])
-        group_cols = [case_id_col, activity_col]
-        df_filtered["instance_id"] = df_filtered.groupby(group_cols).cumcount()
-
-        df_filtered["activity"] = [
-            ActivityInstance(act, inst + 1)
-            for act, inst in zip(df_filtered[activity_col], df_filtered["instance_id"])
-        ]
-        df_filtered["start_timestamp"] = df_filtered[ordering_col]
-        df_filtered["end_timestamp"] = df_filtered[ordering_col]
+        is_start = np.zeros(len(df_filtered), dtype=bool)
 
-        interval_df = df_filtered[
-            [case_id_col, "activity", "start_timestamp", "end_timestamp"]
-        ]
+    group = (
+        df_filtered.groupby([case_id_col, activity_col], sort=False, dropna=False)
+        .ngroup()
+        .to_numpy()
+    )
+    completes, starts = _pair_fifo(group, is_start)
+    # the instances of an activity in a case are numbered in the order of their completion
+    instance = pd.Series(group[completes]).groupby(group[completes]).cumcount() + 1
+    timestamps = df_filtered[ordering_col]
+    interval_df = pd.DataFrame(
+        {
+            case_id_col: df_filtered[case_id_col].iloc[completes].reset_index(drop=True),
+            "activity": df_filtered[activity_col].iloc[completes].reset_index(drop=True),
+            "instance": instance,
+            "start_timestamp": timestamps.iloc[starts].reset_index(drop=True),
+            "end_timestamp": timestamps.iloc[completes].reset_index(drop=True),
+        }
+    )
 
     if interval_df.empty:
         return pd.DataFrame()
@@ -100,6 +124,66 @@ def generate_interval_df_fifo(
     return interval_df
 
 
+def _count_variants(
+    interval_df: pd.DataFrame, case_id_col: str
+) -> Dict[Tuple[FrozenSet, FrozenSet], int]:
+    """
+    Counts the partially ordered variants of the intervals: a case is described by its activity
+    instances, as (activity, instance number) pairs, and the pairs of instances (a, b) such that a
+    ends before b starts. The ordered pairs of all cases are found at once by a binary search of the
+    start of every interval in the end timestamps of its case.
+
+    :return: the frequency of every variant, in the order of the cases
+    """
+    n = len(interval_df)
+    number = interval_df["instance"].to_numpy()
+    if not simplified_objects.ENABLE_DUPLICATION:
+        number = np.ones(n, dtype=np.int64)
+    instances, keys = pd.MultiIndex.from_arrays(
+        [interval_df["activity"], number]
+    ).factorize()
+    keys = [(activity, int(number)) for activity, number in keys]
+    cases, _ = pd.factorize(interval_df[case_id_col], sort=True)
+    timestamps, uniques = pd.factorize(
+        pd.concat([interval_df["start_timestamp"], interval_df["end_timestamp"]]),
+        sort=True,
+    )
+    starts, ends = timestamps[:n], timestamps[n:]
+
+    # intervals ordered by case and end, searched by case and start
+    width = len(uniques) + 1
+    order = np.lexsort((ends, cases))
+    sorted_ends = cases[order] * width + ends[order]
+    case_offsets = np.searchsorted(sorted_ends, cases * width)
+    preceding = np.searchsorted(sorted_ends, cases * width + starts) - case_offsets
+    # the j-th pair ending at an interval b starts at the j-th interval of its case ending first
+    later = np.repeat(np.arange(n), preceding)
+    rank = np.arange(len(later)) - np.repeat(np.cumsum(preceding) - preceding, preceding)
+    earlier = order[np.repeat(case_offsets, preceding) + rank]
+    distinct = instances[earlier] != instances[later]
+    earlier, later = earlier[distinct], later[distinct]
+
+    case_starts = np.flatnonzero(np.r_[True, cases[1:] != cases[:-1]])
+    case_ends = np.r_[case_starts[1:], n]
+    pair_ends = np.searchsorted(later, case_ends)
+    pair_starts = np.r_[0, pair_ends[:-1]]
+    instance_list = [keys[i] for i in instances.tolist()]
+    earlier = [keys[i] for i in instances[earlier].tolist()]
+    later = [keys[i] for i in instances[later].tolist()]
+
+    variants = defaultdict(int)
+    for s, e, ps, pe in zip(
+        case_starts.tolist(),
+        case_ends.tolist(),
+        pair_starts.tolist(),
+        pair_ends.tolist(),
+    ):
+        activities = frozenset(instance_list[s:e])
+        edges = frozenset(zip(earlier[ps:pe], later[ps:pe]))
+        variants[(activities, edges)] += 1
+    return variants
+
+
 def apply(
     df: pd.DataFrame,
     case_id_col: str,
@@ -149,40 +233,23 @@ def apply(
     if interval_df.empty:
         raise Exception("Interval DataFrame is empty, no variants to generate.")
 
-    variants_key_to_frequency = defaultdict(int)
-    interval_df = interval_df.sort_values(
-        [case_id_col, "start_timestamp", "end_timestamp"]
-    ).reset_index(drop=True)
-    grouped_intervals = interval_df.groupby(case_id_col, sort=False)
-
-    for case_id, trace_df in grouped_intervals:
-        trace_activities_multiset = frozenset(trace_df["activity"].tolist())
-
-        trace_events = list(
-            trace_df[["activity", "start_timestamp", "end_timestamp"]].itertuples(
-                index=False, name=None
-            )
-        )
-        events_sorted_by_end = sorted(trace_events, key=lambda x: x[2])
-        end_timestamps = [event[2] for event in events_sorted_by_end]
-
-        edges = []
-        for act_j, start_j, _ in trace_events:
-            pos = bisect_left(end_timestamps, start_j)
-            for i in range(pos):
-                act_i = events_sorted_by_end[i][0]
-                if act_i != act_j:
-                    edges.append((act_i, act_j))
-
-        trace_edges = frozenset(edges)
-        variant_key = (trace_activities_multiset, trace_edges)
-        variants_key_to_frequency[variant_key] += 1
+    variants_key_to_frequency = _count_variants(interval_df, case_id_col)
 
     print(f"Found {len(variants_key_to_frequency)} unique variants.")
 
+    # the activity instances are only created for the distinct variants
+    instances = {}
+    for activities, _ in variants_key_to_frequency:
+        for activity in activities:
+            if activity not in instances:
+                instances[activity] = ActivityInstance(*activity)
     output_list = [
-        Graph(variant_key[0], variant_key[1], {VARIANT_FREQUENCY_KEY: freq})
-        for variant_key, freq in variants_key_to_frequency.items()
+        Graph(
+            frozenset(instances[a] for a in activities),
+            frozenset((instances[a], instances[b]) for a, b in edges),
+            {VARIANT_FREQUENCY_KEY: freq},
+        )
+        for (activities, edges), freq in variants_key_to_frequency.items()
     ]
 
     output_list.sort(
@@ -9,6 +9,15 @@ from pm4py.util import exec_utils, xes_constants as xes_util
 from pm4py.util.compression import util as comut
 from pm4py.util.compression.dtypes import UVCL
 
+from powl.discovery.total_order_based.inductive.utils.activity_encoding import (
+    ActivityEncoding,
+)
+from powl.discovery.total_order_based.inductive.utils.dataframe_variants import (
+    get_dataframe_variants,
+)
+from powl.discovery.total_order_based.inductive.utils.executor import (
+    DiscoveryExecutor,
+)
 from powl.discovery.total_order_based.inductive.variants.im_brute_force import (
     POWLInductiveMinerBruteForce,
 )
@@ -29,7 +38,10 @@ from powl.discovery.total_order_based.inductive.variants.im_dynamic_clustering_f
 from powl.discovery.total_order_based.inductive.variants.im_maximal import (
     POWLInductiveMinerMaximalOrder,
 )
-from powl.discovery.total_order_based.inductive.variants.im_tree import IMBasePOWL
+from powl.discovery.total_order_based.inductive.variants.im_tree import (
+    IMBasePOWL,
+    Parameters as IMParameters,
+)
 from powl.discovery.total_order_based.inductive.variants.powl_discovery_varaints import (
     POWLDiscoveryVariant,
 )
@@ -60,10 +72,11 @@ def get_variant(variant: POWLDiscoveryVariant) -> Type[IMBasePOWL]:
 
 
 def apply(
-    obj: Union[EventLog, pd.DataFrame, UVCL],
+    obj: Union[EventLog, pd.DataFrame, UVCL, IMDataStructureUVCL],
     parameters: Optional[Dict[Any, Any]] = None,
     variant=DEFAULT_POWL_MINER,
     simplify=True,
+    executor: Optional[DiscoveryExecutor] = None,
 ) -> POWL:
     if parameters is None:
         parameters = {}
@@ -76,18 +89,53 @@ def apply(
     cidk = exec_utils.get_param_value(
         Parameters.CASE_ID_KEY, parameters, util.constants.CASE_CONCEPT_NAME
     )
+    encode_activities = exec_utils.get_param_value(
+        IMParameters.ENCODE_ACTIVITIES, parameters, False
+    )
+    encoding = None
+    data_structure = None
     if type(obj) in [EventLog, pd.DataFrame]:
-        uvcl = comut.get_variants(
-            comut.project_univariate(
-                obj, key=ack, df_glue=cidk, df_sorting_criterion_key=tk
+        if encode_activities and type(obj) is pd.DataFrame:
+            # the activity column is encoded before the variants are built
+            encoding = ActivityEncoding.from_dataframe(obj, ack)
+            obj = encoding.encode_dataframe(obj.loc[:, [ack, cidk, tk]], ack)
+        if type(obj) is pd.DataFrame:
+            uvcl = get_dataframe_variants(
+                obj, activity_key=ack, case_id_key=cidk, timestamp_key=tk
+            )
+        else:
+            uvcl = comut.get_variants(
+                comut.project_univariate(
+                    obj, key=ack, df_glue=cidk, df_sorting_criterion_key=tk
+                )
             )
-        )
+    elif isinstance(obj, IMDataStructureUVCL):
+        # a log whose DFG (and eventually-follows graph) is already known, e.g. from a cache
+        data_structure = obj
+        uvcl = obj.data_structure
     else:
         uvcl = obj
+    if encode_activities and encoding is None:
+        encoding = ActivityEncoding.from_variants(uvcl)
+        uvcl = encoding.encode_variants(uvcl)
+        data_structure = None
+    if data_structure is None:
+        data_structure = IMDataStructureUVCL(uvcl)
 
     algorithm = get_variant(variant)
-    im = algorithm(parameters)
-    res = im.apply(IMDataStructureUVCL(uvcl), parameters)
+    im = algorithm(parameters, executor=executor)
+    try:
+        res = im.apply(data_structure, parameters)
+    finally:
+        im.close()
+    if encoding is not None:
+        encoding.decode_model(res)
+        budget = exec_utils.get_param_value(IMParameters.BUDGET, parameters, None)
+        if budget is not None:
+            budget.approximated = [
+                frozenset(encoding.decode(a) for a in activities)
+                for activities in budget.approximated
+            ]
     if simplify:
         res = res.simplify()
 
@@ -23,6 +23,10 @@ from powl.discovery.total_order_based.inductive.cuts.xor import (
     POWLExclusiveChoiceCutDFG,
     POWLExclusiveChoiceCutUVCL,
 )
+from powl.discovery.total_order_based.inductive.utils.cut_context import (
+    CutContext,
+    with_cut_context,
+)
 from powl.objects.obj import POWL
 
 
@@ -52,7 +56,22 @@ class CutFactory:
     def find_cut(
         cls, obj: IMDataStructure, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[Tuple[POWL, List[T]]]:
-        for c in CutFactory.get_cuts(obj):
+        return cls.apply_cuts(CutFactory.get_cuts(obj), obj, parameters)
+
+    @classmethod
+    def apply_cuts(
+        cls,
+        cuts: List[Type[S]],
+        obj: IMDataStructure,
+        parameters: Optional[Dict[str, Any]] = None,
+        context: Optional[CutContext] = None,
+    ) -> Optional[Tuple[POWL, List[T]]]:
+        """
+        Tries the cuts in turn and returns the first one found. The cuts share the context of
+        the sub-log, handed over in a copy of the parameters.
+        """
+        parameters = with_cut_context(obj, parameters, context)
+        for c in cuts:
             r = c.apply(obj, parameters)
             if r is not None:
                 return r
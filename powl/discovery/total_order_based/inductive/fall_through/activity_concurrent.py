@@ -1,17 +1,168 @@
 from collections import Counter
 from multiprocessing import Manager, Pool
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Type
 
-from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
+from pm4py.algo.discovery.inductive.cuts.abc import Cut
+from pm4py.algo.discovery.inductive.cuts.factory import CutFactory
+from pm4py.algo.discovery.inductive.dtypes.im_dfg import InductiveDFG
+from pm4py.algo.discovery.inductive.dtypes.im_ds import (
+    IMDataStructureDFG,
+    IMDataStructureUVCL,
+)
 
 from pm4py.algo.discovery.inductive.fall_through.activity_concurrent import (
     ActivityConcurrentUVCL,
 )
+from pm4py.algo.discovery.inductive.variants.instances import IMInstance
+from pm4py.objects.dfg.obj import DFG
+from pm4py.util.compression.dtypes import UVCL
 
 from powl.objects.obj import StrictPartialOrder
 
 
+def _add_sorted(target: Counter, source: Counter) -> None:
+    # the IM cuts depend on the order of the start and end activities, which pm4py's DFG discovery
+    # inserts in the order of the (sorted) alphabet
+    for a in sorted(source):
+        target[a] += source[a]
+
+
+def discover_removal_bridges(
+    log: UVCL,
+) -> Tuple[DFG, Dict[Any, Tuple[Counter, Counter, Counter]]]:
+    """
+    Directly-follows relations created by removing an activity from the log: removing the runs of
+    an activity a joins the events around them, so x a ... a y yields the edge (x, y), a trace
+    starting (ending) with a run of a gets a new start (end) activity, and a trace consisting of a
+    only becomes empty.
+
+    :return: the DFG of the log and, for every activity, the edges, start activities and end
+        activities its removal adds
+    """
+    dfg = DFG()
+    start_activities = Counter()
+    end_activities = Counter()
+    bridges = {}
+    for trace, freq in log.items():
+        n = len(trace)
+        if n > 0:
+            start_activities[trace[0]] += freq
+            end_activities[trace[-1]] += freq
+        i = 0
+        while i < n:
+            a = trace[i]
+            j = i
+            while j + 1 < n and trace[j + 1] == a:
+                dfg.graph[(a, a)] += freq
+                j += 1
+            if j + 1 < n:
+                dfg.graph[(a, trace[j + 1])] += freq
+            if a not in bridges:
+                bridges[a] = (Counter(), Counter(), Counter())
+            bridge_graph, bridge_starts, bridge_ends = bridges[a]
+            if i > 0 and j + 1 < n:
+                bridge_graph[(trace[i - 1], trace[j + 1])] += freq
+            elif j + 1 < n:
+                bridge_starts[trace[j + 1]] += freq
+            elif i > 0:
+                bridge_ends[trace[i - 1]] += freq
+            i = j + 1
+    _add_sorted(dfg.start_activities, start_activities)
+    _add_sorted(dfg.end_activities, end_activities)
+    return dfg, bridges
+
+
+def remove_activity(
+    dfg: DFG, activity: Any, bridges: Tuple[Counter, Counter, Counter]
+) -> DFG:
+    """
+    :return: the DFG of the log without the activity, derived from the DFG of the log and the
+        bridges of the activity (see discover_removal_bridges)
+    """
+    graph, start_activities, end_activities = bridges
+    result = DFG()
+    for (a, b), freq in dfg.graph.items():
+        if a != activity and b != activity:
+            result.graph[(a, b)] = freq
+    result.graph.update(graph)
+    _add_sorted(
+        result.start_activities,
+        Counter({a: f for a, f in dfg.start_activities.items() if a != activity})
+        + start_activities,
+    )
+    _add_sorted(
+        result.end_activities,
+        Counter({a: f for a, f in dfg.end_activities.items() if a != activity})
+        + end_activities,
+    )
+    return result
+
+
 class POWLActivityConcurrentUVCL(ActivityConcurrentUVCL):
+    @classmethod
+    def _has_cut(
+        cls,
+        dfg: DFG,
+        cuts: List[Type[Cut]],
+        ev=None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        # the IM cuts only decide on the DFG, so the log without the candidate is never built
+        obj = IMDataStructureDFG(InductiveDFG(dfg))
+        for c in cuts:
+            if ev is not None and ev.is_set():
+                return False
+            if c.holds(obj, parameters) is not None:
+                return True
+        return False
+
+    @classmethod
+    def _get_candidate(
+        cls,
+        obj: IMDataStructureUVCL,
+        pool: Pool = None,
+        manager: Manager = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Any]:
+        """
+        Searches the first activity (in sorted order) whose removal from the log enables a cut. The
+        DFG without a candidate is derived from the DFG of the log instead of rediscovered. With a
+        pool, the candidates are evaluated in parallel and the result is the same as the sequential
+        one: results are consumed in candidate order, and the remaining evaluations are cancelled
+        once a candidate is accepted.
+        """
+        # the DFG of the log itself, as the one of the data structure may have been filtered
+        log_dfg, bridges = discover_removal_bridges(obj.data_structure)
+        candidates = sorted(bridges)
+        cuts = CutFactory.get_cuts(obj, IMInstance.IM, parameters=parameters)
+        dfgs = (remove_activity(log_dfg, a, bridges[a]) for a in candidates)
+
+        if (
+            pool is None
+            or manager is None
+            or len(candidates) <= ActivityConcurrentUVCL.MULTI_PROCESSING_LOWER_BOUND
+        ):
+            for a, dfg in zip(candidates, dfgs):
+                if cls._has_cut(dfg, cuts, parameters=parameters):
+                    return a
+            return None
+
+        ev = manager.Event()
+        # evaluations still running after the search must find the event alive
+        manager.support_list.append(ev)
+        results = pool.imap(
+            cls._evaluate_candidate, ((dfg, cuts, ev, parameters) for dfg in dfgs)
+        )
+        for a, found in zip(candidates, results):
+            if found:
+                ev.set()
+                return a
+        return None
+
+    @classmethod
+    def _evaluate_candidate(cls, args) -> bool:
+        return cls._has_cut(*args)
+
     @classmethod
     def apply(
         cls,
@@ -0,0 +1,63 @@
+from collections import Counter
+from typing import Any, Hashable, Iterable
+
+import pandas as pd
+from pm4py.util.compression.dtypes import UVCL
+
+from powl.objects.obj import POWL, Transition
+
+
+class ActivityEncoding:
+    """
+    Dense integer encoding of an activity alphabet. Variants are mined as tuples of integers, which
+    are much cheaper to hash and compare than tuples of (long) activity labels, and the labels are
+    restored on the transitions of the discovered model.
+
+    The codes are offset by a power of ten so that all of them have the same number of digits: their
+    string order, which the cuts use to sort alphabets, and their natural order are then both the
+    order of the labels, and an encoded log is cut exactly as the original one.
+    """
+
+    def __init__(self, activities: Iterable[Hashable]):
+        self._labels = sorted(set(activities), key=lambda a: a.__str__())
+        self._offset = 10 ** len(str(len(self._labels)))
+        self._codes = {
+            label: self._offset + i for i, label in enumerate(self._labels)
+        }
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, activity_key: str) -> "ActivityEncoding":
+        return cls(pd.unique(df[activity_key]))
+
+    @classmethod
+    def from_variants(cls, uvcl: UVCL) -> "ActivityEncoding":
+        return cls({a for variant in uvcl for a in variant})
+
+    def encode(self, activity: Hashable) -> int:
+        return self._codes[activity]
+
+    def decode(self, code: int) -> Any:
+        return self._labels[code - self._offset]
+
+    def encode_dataframe(self, df: pd.DataFrame, activity_key: str) -> pd.DataFrame:
+        return df.assign(**{activity_key: df[activity_key].map(self._codes)})
+
+    def encode_variants(self, uvcl: UVCL) -> UVCL:
+        codes = self._codes
+        return Counter(
+            {tuple(codes[a] for a in variant): freq for variant, freq in uvcl.items()}
+        )
+
+    def decode_model(self, powl: POWL) -> None:
+        """
+        Replaces the codes by the activity labels on all transitions of the model (in place).
+        """
+        if isinstance(powl, Transition):
+            if powl.label is not None:
+                powl._label = self.decode(powl.label)
+        else:
+            for child in powl.children:
+                self.decode_model(child)
@@ -0,0 +1,89 @@
+import time
+from threading import Lock
+from typing import Any, Collection, FrozenSet, List, Optional
+
+# key of the budget in the parameters of the miners (and of the cuts checking it)
+BUDGET = "budget"
+
+
+class BudgetExhausted(Exception):
+    """
+    Raised by long-running cut searches (e.g. the brute-force partition enumeration) when the
+    discovery budget runs out; the miner then approximates the sub-log being cut.
+    """
+
+
+class DiscoveryBudget:
+    """
+    Bounds the effort of a discovery run by wall-clock time and/or by the number of sub-logs mined
+    with the full variant. Once the budget is exhausted, the remaining sub-logs are approximated
+    with cheap cuts (the base IM cuts and the maximal partial order cut) and, failing that, a
+    flower model. The activities of every approximated sub-model are reported in ``approximated``:
+
+        budget = DiscoveryBudget(time_limit=60)
+        model = powl.discover(log, budget=budget)
+        if budget.approximated:
+            ...
+
+    With process-based parallel recursion, each worker checks a copy of the budget: the time limit
+    is shared, but the step limit applies to every worker separately.
+
+    :param time_limit: seconds, counted from the start of the discovery (None: unbounded)
+    :param max_steps: number of sub-logs mined with the full variant (None: unbounded)
+    """
+
+    def __init__(
+        self, time_limit: Optional[float] = None, max_steps: Optional[int] = None
+    ):
+        self.time_limit = time_limit
+        self.max_steps = max_steps
+        self.steps = 0
+        self.approximated: List[FrozenSet[Any]] = []
+        self._deadline = None
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def start(self) -> None:
+        # wall-clock time, so that the deadline also holds in worker processes
+        if self._deadline is None and self.time_limit is not None:
+            self._deadline = time.time() + self.time_limit
+
+    @property
+    def exhausted(self) -> bool:
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            return True
+        return self._deadline is not None and time.time() >= self._deadline
+
+    def charge(self) -> bool:
+        """
+        Accounts for mining a sub-log with the full variant.
+
+        :return: False if the budget is exhausted and the sub-log has to be approximated
+        """
+        with self._lock:
+            if self.exhausted:
+                return False
+            self.steps = self.steps + 1
+            return True
+
+    def check(self) -> None:
+        if self.exhausted:
+            raise BudgetExhausted()
+
+    def record(self, activities: Collection[Any]) -> None:
+        with self._lock:
+            self.approximated.append(frozenset(activities))
+
+    def merge(self, other: "DiscoveryBudget") -> None:
+        # reports of a copy of the budget used by a worker process
+        for activities in other.approximated:
+            if activities not in self.approximated:
+                self.record(activities)
@@ -0,0 +1,337 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pm4py.util.compression.dtypes import UVCL
+
+from powl.discovery.total_order_based.inductive.utils.eventually_follows import (
+    count_eventually_follows,
+    flatten_log,
+    run_starts,
+)
+from powl.objects.BinaryRelation import BinaryRelation
+
+
+class UnionFind:
+    """
+    Disjoint sets over the ids 0..n-1 (with path halving and union by size). The members of every
+    set are kept in merge order: the union of i and j lists the members of the set of i first.
+    The root of every id is also kept in an array, which a union updates for the members of the
+    smaller set.
+    """
+
+    def __init__(self, n: int):
+        self._parent = list(range(n))
+        self._members = [[i] for i in range(n)]
+        self._cluster_of = np.arange(n, dtype=np.int64)
+
+    def find(self, i: int) -> int:
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> Optional[Tuple[int, int]]:
+        """
+        :return: the root of the merged set and the root absorbed into it (None if i and j already
+            are in the same set)
+        """
+        root_i = self.find(i)
+        root_j = self.find(j)
+        if root_i == root_j:
+            return None
+        members = self._members[root_i] + self._members[root_j]
+        if len(self._members[root_i]) < len(self._members[root_j]):
+            root_i, root_j = root_j, root_i
+        self._parent[root_j] = root_i
+        self._cluster_of[self._members[root_j]] = root_i
+        self._members[root_i] = members
+        self._members[root_j] = None
+        return root_i, root_j
+
+    def members(self, root: int) -> List[int]:
+        return self._members[root]
+
+    def roots(self) -> List[int]:
+        return [i for i, parent in enumerate(self._parent) if parent == i]
+
+    def root_ids(self) -> np.ndarray:
+        """
+        :return: the root of every id (not to be modified)
+        """
+        return self._cluster_of
+
+
+class ClusterFrequencies(ABC):
+    """
+    Eventually-follows frequencies between clusters: ``freq[x][y]`` for the roots x and y of two
+    clusters (the rows and columns of absorbed roots are stale).
+    """
+
+    def __init__(self, freq: np.ndarray):
+        self.freq = freq
+
+    @abstractmethod
+    def merge(self, root: int, other: int, clusters: UnionFind) -> None:
+        pass
+
+
+class PairFrequencies(ClusterFrequencies):
+    """
+    Frequencies that add up over the activity pairs of two clusters (e.g. the number of pairs in
+    the transitive closure of a DFG): a merge sums two rows and two columns.
+    """
+
+    @classmethod
+    def from_pairs(
+        cls, pairs: Dict[Tuple[Any, Any], int], index: Dict[Any, int]
+    ) -> "PairFrequencies":
+        freq = np.zeros((len(index), len(index)), dtype=np.int64)
+        for (a, b), value in pairs.items():
+            freq[index[a], index[b]] += value
+        return cls(freq)
+
+    def merge(self, root: int, other: int, clusters: UnionFind) -> None:
+        freq = self.freq
+        diagonal = (
+            freq[root, root] + freq[root, other] + freq[other, root] + freq[other, other]
+        )
+        freq[root, :] += freq[other, :]
+        freq[:, root] += freq[:, other]
+        freq[root, root] = diagonal
+
+
+class TraceFrequencies(ClusterFrequencies):
+    """
+    Number of traces in which an activity of a cluster is eventually followed by an activity of
+    another one. These do not add up over activity pairs, so the row and column of a merged cluster
+    are recounted from the events: an event of cluster y follows cluster x in a trace iff it occurs
+    after the first event of x in that trace. Only the variants containing the merged cluster are
+    visited, so a merge costs O(k + e), with k the number of activities and e the number of events
+    of these variants.
+    """
+
+    def __init__(
+        self,
+        log: UVCL,
+        index: Dict[Any, int],
+        efg: Optional[Dict[Tuple[Any, Any], int]] = None,
+    ):
+        """
+        :param log: variants and their frequencies
+        :param index: ids of the activities
+        :param efg: the eventually-follows graph of the log, if already computed (see
+            eventually_follows.discover_efg)
+        """
+        self._n = len(index)
+        (
+            self._activities,
+            self._variants,
+            self._positions,
+            self._frequencies,
+        ) = flatten_log(log, index)
+        n = self._n
+        # the events of every activity, and the range of the events of every variant
+        self._activity_events = np.argsort(self._activities, kind="stable")
+        self._activity_offsets = np.searchsorted(
+            self._activities[self._activity_events], np.arange(n + 1)
+        )
+        self._variant_offsets = np.searchsorted(
+            self._variants, np.arange(len(self._frequencies) + 1)
+        )
+        if efg is None:
+            keys, counts = count_eventually_follows(
+                self._activities,
+                self._variants,
+                self._positions,
+                self._frequencies,
+                n,
+            )
+            freq = np.zeros(n * n, dtype=np.int64)
+            freq[keys] = counts
+            freq = freq.reshape((n, n))
+        else:
+            freq = np.zeros((n, n), dtype=np.int64)
+            for (a, b), count in efg.items():
+                freq[index[a], index[b]] = count
+        super().__init__(freq)
+
+    def _count_following(self, variants: np.ndarray, clusters: np.ndarray) -> np.ndarray:
+        # number of traces with an event of each cluster among the given events
+        keys = np.unique(variants * self._n + clusters)
+        counts = np.bincount(
+            keys % self._n,
+            weights=self._frequencies[keys // self._n],
+            minlength=self._n,
+        )
+        return counts.astype(np.int64)
+
+    def merge(self, root: int, other: int, clusters: UnionFind) -> None:
+        offsets = self._activity_offsets
+        events = np.sort(
+            np.concatenate(
+                [
+                    self._activity_events[offsets[a] : offsets[a + 1]]
+                    for a in clusters.members(root)
+                ]
+            )
+        )
+        variants = self._variants[events]
+        # the events are ordered by variant and position
+        starts = run_starts(variants)
+        ends = np.r_[starts[1:], len(events)] - 1
+        first = self._positions[events[starts]]
+        last = self._positions[events[ends]]
+
+        # the events of the variants containing the merged cluster
+        variants = variants[starts]
+        lengths = self._variant_offsets[variants + 1] - self._variant_offsets[variants]
+        gathered = np.repeat(
+            self._variant_offsets[variants] - (np.cumsum(lengths) - lengths), lengths
+        ) + np.arange(lengths.sum())
+        variants = self._variants[gathered]
+        event_clusters = clusters.root_ids()[self._activities[gathered]]
+        positions = self._positions[gathered]
+        after = positions > np.repeat(first, lengths)
+        before = positions < np.repeat(last, lengths)
+        self.freq[root, :] = self._count_following(variants[after], event_clusters[after])
+        self.freq[:, root] = self._count_following(
+            variants[before], event_clusters[before]
+        )
+
+
+class DynamicClustering:
+    """
+    Clusters the activities until the clusters are ordered by a strict partial order. Starting
+    from singletons, a round orders the clusters by their eventually-follows frequencies, closes the
+    order transitively and merges clusters that cannot be ordered, are in a choice, or share their
+    pre- and post-sets; the clustering stops at the first round without merges.
+
+    The clusters are kept in a union-find and the eventually-follows frequencies between them are
+    updated on each merge (see the merge of the frequencies) instead of being recounted from the
+    log. Every round still rebuilds the order of the current clusters and closes it, which costs
+    O(c^3) for c clusters in the worst case.
+
+    :param alphabet: the activities
+    :param frequencies: eventually-follows frequencies between the activities (indexed as in the
+        alphabet), updated in place
+    :param order_frequency_ratio: minimum share of the eventually-follows frequency of two clusters
+        in one direction for ordering them in that direction
+    :param closure_requires_unrelated: if True, a transitive edge x->z is only added if x and z are
+        not eventually-following in either direction; otherwise, if z is not eventually followed by
+        x. In the other cases, x and z are merged
+    """
+
+    def __init__(
+        self,
+        alphabet: List[Any],
+        frequencies: ClusterFrequencies,
+        order_frequency_ratio: float = 1.0,
+        closure_requires_unrelated: bool = True,
+    ):
+        self._alphabet = alphabet
+        self._frequencies = frequencies
+        self._order_frequency_ratio = order_frequency_ratio
+        self._closure_requires_unrelated = closure_requires_unrelated
+        self._clusters = UnionFind(len(alphabet))
+
+    def merge(self, i: int, j: int) -> None:
+        merged = self._clusters.union(i, j)
+        if merged is not None:
+            self._frequencies.merge(merged[0], merged[1], self._clusters)
+
+    def _order(self, freq: np.ndarray) -> np.ndarray:
+        both = freq + freq.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            order = (both > 0) & (freq / both >= self._order_frequency_ratio)
+        np.fill_diagonal(order, False)
+        return order
+
+    def _close(self, order: np.ndarray, freq: np.ndarray) -> Optional[Tuple[int, int]]:
+        """
+        Adds the missing transitive edges in place, visiting them in the order of the triples
+        (i, j, k), and stops at the first one that cannot be added.
+
+        :return: the ids of the clusters to merge (None if the order is closed)
+        """
+        if self._closure_requires_unrelated:
+            can_add = freq + freq.T == 0
+        else:
+            can_add = freq.T == 0
+            np.fill_diagonal(can_add, True)
+        n = len(order)
+        while (order @ order & ~order).any():
+            for i in range(n):
+                for j in range(n):
+                    if i == j or not order[i, j]:
+                        continue
+                    # only edge (i, k) changes while visiting the missing edges through j
+                    for k in np.flatnonzero(order[j] & ~order[i]):
+                        if can_add[i, k]:
+                            order[i, k] = True
+                        else:
+                            return i, k
+        return None
+
+    def generate_order(self) -> Optional[BinaryRelation]:
+        while True:
+            roots = self._clusters.roots()
+            if len(roots) < 2:
+                return None
+            clusters = sorted(
+                (
+                    [self._alphabet[a] for a in self._clusters.members(root)],
+                    root,
+                )
+                for root in roots
+            )
+            nodes = [tuple(cluster) for cluster, _ in clusters]
+            ids = [root for _, root in clusters]
+            freq = self._frequencies.freq[np.ix_(ids, ids)]
+
+            # Step 1: order the clusters by their eventually-follows frequencies
+            order = self._order(freq)
+
+            # Step 2: ensure transitivity and irreflexivity
+            violation = self._close(order, freq)
+            if violation is not None:
+                i, k = violation
+                if i == k:
+                    raise Exception("Unable to close the order of the clusters!")
+                self.merge(ids[i], ids[k])
+                continue
+
+            changed = False
+            if order.diagonal().any():
+                for i, j in zip(*np.nonzero(np.triu(order & order.T, 1))):
+                    self.merge(ids[i], ids[j])
+                    changed = True
+            if changed:
+                continue
+
+            # Step 3: merge the clusters in a choice
+            unrelated = ~(order | order.T) & (freq == 0) & (freq.T == 0)
+            for i, j in zip(*np.nonzero(np.triu(unrelated, 1))):
+                self.merge(ids[i], ids[j])
+                changed = True
+            if changed:
+                continue
+
+            # Step 4: merge the clusters sharing the same pre- and post-sets
+            strict = order.copy()
+            np.fill_diagonal(strict, False)
+            groups = {}
+            for i in range(len(nodes)):
+                key = (strict[:, i].tobytes(), strict[i, :].tobytes())
+                groups.setdefault(key, []).append(i)
+            for group in groups.values():
+                for j in group[1:]:
+                    self.merge(ids[group[0]], ids[j])
+                    changed = True
+
+            if not changed or len(self._clusters.roots()) < 2:
+                po = BinaryRelation(nodes)
+                for i, j in zip(*np.nonzero(order)):
+                    po.add_edge_id(i, j)
+                return po
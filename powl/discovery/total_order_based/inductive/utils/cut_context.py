@@ -0,0 +1,107 @@
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+from pm4py.algo.discovery.inductive.dtypes.im_ds import (
+    IMDataStructure,
+    IMDataStructureUVCL,
+)
+from pm4py.objects.dfg import util as dfu
+
+from powl.discovery.total_order_based.inductive.utils.eventually_follows import get_efg
+
+# key of the cut context in the parameters handed to the cuts by the cut factories
+CUT_CONTEXT = "cut_context"
+
+
+class CutContext:
+    """
+    Analysis of a sub-log shared by all the cuts tried on it: the alphabet, the start and end
+    activities, the transitive relations of the DFG and the eventually-follows graph. Each of them
+    is computed on first access and never changes afterwards; the returned collections must not be
+    modified. The context is handed to the cuts by CutFactory.apply_cuts, instead of the cuts
+    writing their intermediate results into the (shared) parameters.
+
+    :param obj: the sub-log
+    """
+
+    def __init__(self, obj: IMDataStructure):
+        self._obj = obj
+        self._alphabet = None
+        self._start_activities = None
+        self._end_activities = None
+        self._transitive_relations = None
+
+    @property
+    def obj(self) -> IMDataStructure:
+        return self._obj
+
+    @property
+    def alphabet(self) -> Tuple[Any, ...]:
+        # sorted by the string representation of the activities
+        if self._alphabet is None:
+            self._alphabet = tuple(
+                sorted(dfu.get_vertices(self._obj.dfg), key=lambda g: g.__str__())
+            )
+        return self._alphabet
+
+    @property
+    def start_activities(self) -> FrozenSet[Any]:
+        if self._start_activities is None:
+            self._start_activities = frozenset(self._obj.dfg.start_activities.keys())
+        return self._start_activities
+
+    @property
+    def end_activities(self) -> FrozenSet[Any]:
+        if self._end_activities is None:
+            self._end_activities = frozenset(self._obj.dfg.end_activities.keys())
+        return self._end_activities
+
+    @property
+    def transitive_predecessors(self) -> Dict[Any, Set[Any]]:
+        return self._get_transitive_relations()[0]
+
+    @property
+    def transitive_successors(self) -> Dict[Any, Set[Any]]:
+        return self._get_transitive_relations()[1]
+
+    def _get_transitive_relations(self):
+        if self._transitive_relations is None:
+            self._transitive_relations = dfu.get_transitive_relations(self._obj.dfg)
+        return self._transitive_relations
+
+    @property
+    def efg(self) -> Dict[Tuple[Any, Any], int]:
+        # eventually-follows graph of a log (cached on the sub-log itself)
+        if type(self._obj) is not IMDataStructureUVCL:
+            raise Exception("The eventually-follows graph requires a log!")
+        return get_efg(self._obj)
+
+
+def get_cut_context(
+    obj: IMDataStructure, parameters: Optional[Dict[Any, Any]] = None
+) -> CutContext:
+    """
+    :return: the context of the sub-log handed over in the parameters, or a new one if the cut is
+        applied on its own
+    """
+    context = parameters.get(CUT_CONTEXT) if parameters else None
+    if context is None or context.obj is not obj:
+        context = CutContext(obj)
+    return context
+
+
+def with_cut_context(
+    obj: IMDataStructure,
+    parameters: Optional[Dict[Any, Any]] = None,
+    context: Optional[CutContext] = None,
+) -> Dict[Any, Any]:
+    """
+    :return: the parameters, or a copy of them holding the context of the sub-log (the given
+        parameters are never modified)
+    """
+    if context is None:
+        context = get_cut_context(obj, parameters)
+    if parameters and parameters.get(CUT_CONTEXT) is context:
+        return parameters
+    parameters = dict(parameters) if parameters else {}
+    parameters[CUT_CONTEXT] = context
+    return parameters
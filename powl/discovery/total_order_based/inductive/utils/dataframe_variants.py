@@ -0,0 +1,146 @@
+from collections import Counter
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from pm4py.util.compression.dtypes import UVCL
+
+from powl.discovery.total_order_based.inductive.utils.eventually_follows import run_starts
+
+# seed of the random weights of the positions in the hashes of the cases
+HASH_SEED = 0
+
+
+def _sort_codes(values: pd.Series) -> Tuple[np.ndarray, int]:
+    """
+    :return: codes in the order of the values (missing values last, as when sorting a dataframe)
+        and the number of codes
+    """
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.dt.tz_convert(None)
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "iuM":
+        # integers and timestamps are ranked by sorting, which beats hashing many distinct values
+        values = values.to_numpy()
+        if values.dtype.kind == "M":
+            missing = np.isnat(values)
+            values = values.view(np.int64).copy()
+            values[missing] = np.iinfo(np.int64).max
+        uniques, codes = np.unique(values, return_inverse=True)
+        return codes.astype(np.int64), len(uniques)
+    codes, uniques = pd.factorize(values, sort=True)
+    codes = codes.astype(np.int64)
+    codes[codes < 0] = len(uniques)
+    return codes, len(uniques) + 1
+
+
+def _hash_cases(
+    codes: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Two 64-bit hashes of the code sequence of every case: the sums of the codes weighted by random
+    numbers drawn for every position (with wrap-around arithmetic).
+    """
+    positions = np.arange(len(codes)) - np.repeat(starts, lengths)
+    rng = np.random.default_rng(HASH_SEED)
+    hashes = []
+    for _ in range(2):
+        weights = rng.integers(
+            0, np.iinfo(np.uint64).max, size=int(lengths.max()), dtype=np.uint64
+        )
+        weighted = (codes.astype(np.uint64) + np.uint64(1)) * weights[positions]
+        hashes.append(np.add.reduceat(weighted, starts))
+    return hashes[0], hashes[1]
+
+
+def _group_cases(
+    codes: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Groups the cases by their code sequence.
+
+    :return: the group of every case and the first case of every group (the groups are numbered
+        in the order of their first case)
+    """
+    h1, h2 = _hash_cases(codes, starts, lengths)
+    order = np.lexsort((np.arange(len(starts)), h2, h1, lengths))
+    new_group = np.r_[
+        True,
+        (np.diff(lengths[order]) != 0)
+        | (np.diff(h1[order]) != 0)
+        | (np.diff(h2[order]) != 0),
+    ]
+    # the first case of a group comes first in its run, as the runs are sorted by case
+    firsts = order[new_group]
+    sorted_firsts = np.sort(firsts)
+    groups = np.empty(len(starts), dtype=np.int64)
+    groups[order] = np.searchsorted(sorted_firsts, firsts)[np.cumsum(new_group) - 1]
+    return groups, sorted_firsts
+
+
+def _cases_match(
+    codes: np.ndarray,
+    starts: np.ndarray,
+    lengths: np.ndarray,
+    representatives: np.ndarray,
+) -> bool:
+    # whether every case has the same codes as the first case of its group (no hash collision)
+    positions = np.arange(len(codes)) - np.repeat(starts, lengths)
+    other = np.repeat(starts[representatives], lengths) + positions
+    return bool((codes == codes[other]).all())
+
+
+def get_dataframe_variants(
+    df: pd.DataFrame,
+    activity_key: str = "concept:name",
+    case_id_key: str = "case:concept:name",
+    timestamp_key: str = "time:timestamp",
+) -> UVCL:
+    """
+    Variants of a dataframe, equal to the ones of pm4py's univariate projection (including the
+    order): the cases are ordered by their identifier, the events of a case by their timestamp (and
+    their position in the dataframe), and the variants by their first case.
+
+    The case identifiers, activities and timestamps are factorized into integer codes and sorted
+    at once; the cases with the same activity sequence are then found by hashing the sequences in
+    bulk, and only one tuple of activities is built per variant.
+    """
+    if len(df) == 0:
+        return Counter()
+    cases, num_cases = _sort_codes(df[case_id_key])
+    timestamps, num_timestamps = _sort_codes(df[timestamp_key])
+    activities, labels = pd.factorize(df[activity_key], use_na_sentinel=False)
+    activities = activities.astype(np.int64)
+    labels = labels.tolist()
+
+    if num_cases * num_timestamps < np.iinfo(np.int64).max:
+        # a stable sort on a single key is much faster than a lexicographic sort on two
+        order = np.argsort(cases * num_timestamps + timestamps, kind="stable")
+    else:
+        order = np.lexsort((timestamps, cases))
+    cases = cases[order]
+    activities = activities[order]
+    starts = run_starts(cases)
+    lengths = np.diff(np.r_[starts, len(cases)])
+
+    groups, firsts = _group_cases(activities, starts, lengths)
+    if not _cases_match(activities, starts, lengths, firsts[groups]):
+        # a hash collision: the variants are built case by case
+        uvcl = Counter()
+        for s, n in zip(starts.tolist(), lengths.tolist()):
+            uvcl[tuple(labels[a] for a in activities[s : s + n].tolist())] += 1
+        return uvcl
+
+    # the activities of the first cases of the groups, gathered at once
+    variant_lengths = lengths[firsts]
+    offsets = np.cumsum(variant_lengths) - variant_lengths
+    events = np.repeat(starts[firsts] - offsets, variant_lengths) + np.arange(
+        variant_lengths.sum()
+    )
+    values = np.array(labels + [None], dtype=object)[:-1][activities[events]].tolist()
+    frequencies = np.bincount(groups, minlength=len(firsts))
+    uvcl = Counter()
+    for o, n, freq in zip(
+        offsets.tolist(), variant_lengths.tolist(), frequencies.tolist()
+    ):
+        uvcl[tuple(values[o : o + n])] = freq
+    return uvcl
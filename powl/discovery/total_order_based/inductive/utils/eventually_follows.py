@@ -0,0 +1,148 @@
+from typing import Any, Dict, Hashable, List, Tuple
+
+import numpy as np
+from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
+from pm4py.util.compression.dtypes import UVCL
+
+# attribute of the data structure of a sub-log holding its eventually-follows graph
+EFG_ATTRIBUTE = "_powl_efg"
+
+# bound on the number of activity pairs expanded at once
+PAIRS_PER_CHUNK = 1 << 22
+# alphabets with up to this many pairs of activities are counted in a dense table
+DENSE_PAIRS = 1 << 22
+
+
+def run_starts(values: np.ndarray) -> np.ndarray:
+    # positions at which a run of equal values starts
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+
+
+def flatten_log(
+    log: UVCL, index: Dict[Hashable, int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :return: the activity ids, variant ids and positions of all events (ordered by variant and
+        position), and the frequency of every variant
+    """
+    activities = []
+    variants = []
+    positions = []
+    frequencies = []
+    for v, (trace, freq) in enumerate(log.items()):
+        frequencies.append(freq)
+        for p, activity in enumerate(trace):
+            activities.append(index[activity])
+            variants.append(v)
+            positions.append(p)
+    return (
+        np.array(activities, dtype=np.int64),
+        np.array(variants, dtype=np.int64),
+        np.array(positions, dtype=np.int64),
+        np.array(frequencies, dtype=np.int64),
+    )
+
+
+def count_eventually_follows(
+    activities: np.ndarray,
+    variants: np.ndarray,
+    positions: np.ndarray,
+    frequencies: np.ndarray,
+    n: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts, for every pair of activities (a, b), the traces in which a is eventually followed by b,
+    i.e. in which the first a precedes the last b. Only the distinct activities of every variant
+    are paired, instead of all pairs of its events.
+
+    :return: the pairs (as a * n + b) and their frequencies
+    """
+    # first and last position of every activity in every variant
+    keys = variants * n + activities
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    positions = positions[order]
+    starts = run_starts(keys)
+    ends = np.r_[starts[1:], len(keys)]
+    first = positions[starts]
+    last = positions[ends - 1]
+    entry_variants = keys[starts] // n
+    entry_activities = keys[starts] % n
+
+    block_starts = run_starts(entry_variants)
+    block_sizes = np.diff(np.r_[block_starts, len(entry_variants)])
+    # the variants are expanded in chunks of consecutive variants
+    chunk_ids = np.cumsum(block_sizes * block_sizes) // PAIRS_PER_CHUNK
+    chunk_starts = run_starts(chunk_ids)
+    chunk_ends = np.r_[chunk_starts[1:], len(block_starts)]
+
+    # small alphabets are counted in a dense table, saving the sorting of the pairs
+    dense = np.zeros(n * n) if n * n <= DENSE_PAIRS else None
+    pair_keys = []
+    pair_counts = []
+    for c0, c1 in zip(chunk_starts, chunk_ends):
+        starts_c = block_starts[c0:c1]
+        sizes_c = block_sizes[c0:c1]
+        sizes = np.repeat(sizes_c, sizes_c)
+        offsets = np.cumsum(sizes) - sizes
+        left = np.repeat(np.arange(starts_c[0], starts_c[0] + len(sizes)), sizes)
+        right = np.repeat(np.repeat(starts_c, sizes_c), sizes) + (
+            np.arange(len(left)) - np.repeat(offsets, sizes)
+        )
+        mask = first[left] < last[right]
+        left = left[mask]
+        right = right[mask]
+        chunk_keys = entry_activities[left] * n + entry_activities[right]
+        weights = frequencies[entry_variants[left]]
+        if dense is not None:
+            dense += np.bincount(chunk_keys, weights=weights, minlength=n * n)
+            continue
+        chunk_keys, inverse = np.unique(chunk_keys, return_inverse=True)
+        pair_keys.append(chunk_keys)
+        pair_counts.append(np.bincount(inverse, weights=weights))
+
+    if dense is not None:
+        pair_keys = np.flatnonzero(dense)
+        return pair_keys, np.rint(dense[pair_keys]).astype(np.int64)
+    if not pair_keys:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pair_keys, inverse = np.unique(np.concatenate(pair_keys), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate(pair_counts))
+    return pair_keys, np.rint(counts).astype(np.int64)
+
+
+def discover_efg(log: UVCL) -> Dict[Tuple[Any, Any], int]:
+    """
+    Eventually-follows graph of a log: for every pair of activities (a, b) such that a is
+    eventually followed by b in some trace, the number of such traces. The pairs are the ones of
+    pm4py's eventually-follows graph (which counts every pair of events instead of the traces).
+    """
+    alphabet: List[Any] = []
+    index: Dict[Hashable, int] = {}
+    for trace in log:
+        for activity in trace:
+            if activity not in index:
+                index[activity] = len(alphabet)
+                alphabet.append(activity)
+    n = len(alphabet)
+    if n == 0:
+        return {}
+    keys, counts = count_eventually_follows(*flatten_log(log, index), n)
+    return {
+        (alphabet[key // n], alphabet[key % n]): count
+        for key, count in zip(keys.tolist(), counts.tolist())
+    }
+
+
+def get_efg(obj: IMDataStructureUVCL) -> Dict[Tuple[Any, Any], int]:
+    """
+    Eventually-follows graph of a sub-log (see discover_efg), computed once and cached on its data
+    structure, so that all the cuts tried on the sub-log share it. The result must not be modified.
+    """
+    efg = getattr(obj, EFG_ATTRIBUTE, None)
+    if efg is None:
+        efg = discover_efg(obj.data_structure)
+        setattr(obj, EFG_ATTRIBUTE, efg)
+    return efg
@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import Executor
+from typing import Dict, Optional
+
+from powl.discovery.total_order_based.inductive.utils.parallel_recursion import (
+    create_executor,
+    ParallelRecursion,
+)
+
+
+class DiscoveryExecutor:
+    """
+    Worker pools of the POWL miners, created on first use and reused by every discovery run the
+    executor is passed to. It holds the multiprocessing pool (and manager) of the fall-throughs and
+    the executors of the parallel recursion, and must be shut down explicitly, preferably by using
+    it as a context manager:
+
+        with DiscoveryExecutor() as executor:
+            for log in logs:
+                powl.discover(log, executor=executor)
+
+    :param processes: number of workers of each pool (defaults to the number of CPUs minus one)
+    :param parallel_recursion: mode of the parallel recursion of the miners using this executor,
+        unless overridden by their parameters (None: the children of a cut are mined sequentially)
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        parallel_recursion: Optional[ParallelRecursion] = None,
+    ):
+        if processes is None:
+            processes = max(1, (os.cpu_count() or 1) - 1)
+        self.processes = processes
+        self.parallel_recursion = parallel_recursion
+        self._pool = None
+        self._manager = None
+        self._executors: Dict[ParallelRecursion, Executor] = {}
+        self._closed = False
+
+    def __enter__(self) -> "DiscoveryExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise Exception("The discovery executor has been shut down!")
+
+    def get_pool(self):
+        self._check_open()
+        if self._pool is None:
+            from multiprocessing import Manager, Pool
+
+            self._pool = Pool(self.processes)
+            self._manager = Manager()
+            self._manager.support_list = []
+        return self._pool, self._manager
+
+    def get_recursion_executor(self, mode: ParallelRecursion) -> Executor:
+        self._check_open()
+        if mode not in self._executors:
+            self._executors[mode] = create_executor(mode, self.processes)
+        return self._executors[mode]
+
+    def shutdown(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._manager.shutdown()
+            self._pool = None
+            self._manager = None
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors = {}
@@ -1,7 +1,9 @@
 from collections import Counter
 from enum import auto, Enum
 
+import numpy as np
 from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
+from pm4py.util.compression.dtypes import UVCL
 
 
 class FilteringType(Enum):
@@ -15,31 +17,52 @@ FILTERING_THRESHOLD = "weight_factor_filtering_threshold"
 FILTERING_TYPE = "filtering_type"
 
 
-def filter_most_frequent_variants(log):
-    to_remove_freq = min([freq for var, freq in log.items()])
-    new_log = Counter()
-    for var, freq in log.items():
-        if freq == to_remove_freq:
-            continue
-        new_log[var] = freq
+class VariantFrequencyIndex:
+    """
+    Variants of a log indexed by their frequency, built once per sub-log and shared by all the
+    filtering thresholds tried on it: the distinct frequencies in increasing order (the thresholds
+    of the dynamic filtering) and, on first use, the variants sorted by decreasing frequency (the
+    order in which the decreasing factor filtering keeps them).
+
+    :param log: variants and their frequencies
+    """
+
+    def __init__(self, log: UVCL):
+        self._log = log
+        self.frequencies = sorted(set(log.values()))
+        self._sorted_variants = None
+        self._sorted_frequencies = None
+
+    def above(self, frequency: int) -> UVCL:
+        """
+        :return: the variants more frequent than the given frequency, in the order of the log
+        """
+        return Counter(
+            {var: freq for var, freq in self._log.items() if freq > frequency}
+        )
 
-    return IMDataStructureUVCL(new_log)
+    def with_decreasing_factor(self, decreasing_factor: float) -> UVCL:
+        """
+        :return: the most frequent variants, in decreasing order of frequency, up to the first one
+            not more frequent than the decreasing factor times the frequency of its predecessor
+        """
+        if self._sorted_variants is None:
+            self._sorted_variants = sorted(self._log, key=self._log.get, reverse=True)
+            self._sorted_frequencies = np.array(
+                [self._log[var] for var in self._sorted_variants], dtype=np.int64
+            )
+        frequencies = self._sorted_frequencies
+        drops = np.flatnonzero(frequencies[1:] <= decreasing_factor * frequencies[:-1])
+        end = drops[0] + 1 if len(drops) > 0 else len(frequencies)
+        return Counter({var: self._log[var] for var in self._sorted_variants[:end]})
+
+
+def filter_most_frequent_variants(log):
+    index = VariantFrequencyIndex(log)
+    return IMDataStructureUVCL(index.above(index.frequencies[0]))
 
 
 def filter_most_frequent_variants_with_decreasing_factor(log, decreasing_factor):
-    sorted_variants = sorted(log, key=log.get, reverse=True)
-    new_log = Counter()
-
-    already_added_sum = 0
-    prev_var_count = -1
-
-    for variant in sorted_variants:
-        frequency = log[variant]
-        if already_added_sum == 0 or frequency > decreasing_factor * prev_var_count:
-            new_log[variant] = frequency
-            already_added_sum = already_added_sum + frequency
-            prev_var_count = frequency
-        else:
-            break
-
-    return IMDataStructureUVCL(new_log)
+    return IMDataStructureUVCL(
+        VariantFrequencyIndex(log).with_decreasing_factor(decreasing_factor)
+    )
@@ -0,0 +1,85 @@
+from typing import Any, Collection, Iterable, List, Tuple
+
+import numpy as np
+
+from powl.objects.BinaryRelation import BinaryRelation
+
+
+class GroupEFG:
+    """
+    Eventually-follows graph summarized over groups of activities: for every ordered pair of
+    groups, whether all or none of the pairs of their activities are eventually following, and for
+    every group whether it contains a start and an end activity. Orders over the groups are then
+    generated and validated by indexing instead of looping over the pairs of activities.
+
+    :param groups: disjoint groups of activities
+    :param efg: the pairs of eventually-following activities
+    :param start_activities: start activities
+    :param end_activities: end activities
+    """
+
+    def __init__(
+        self,
+        groups: List[Collection[Any]],
+        efg: Iterable[Tuple[Any, Any]],
+        start_activities: Collection[Any] = (),
+        end_activities: Collection[Any] = (),
+    ):
+        self.groups = list(groups)
+        index = {}
+        for i, group in enumerate(self.groups):
+            for activity in group:
+                index[activity] = i
+        k = len(self.groups)
+        counts = np.zeros((k, k), dtype=np.int64)
+        for a, b in efg:
+            i = index.get(a)
+            j = index.get(b)
+            if i is not None and j is not None:
+                counts[i, j] += 1
+        sizes = np.array([len(group) for group in self.groups], dtype=np.int64)
+        self.all_ef = counts == np.outer(sizes, sizes)
+        self.no_ef = counts == 0
+        self.has_start = np.array(
+            [any(a in start_activities for a in group) for group in self.groups],
+            dtype=bool,
+        )
+        self.has_end = np.array(
+            [any(a in end_activities for a in group) for group in self.groups],
+            dtype=bool,
+        )
+
+    def generate_order(self) -> BinaryRelation:
+        """
+        Orders a group before another one if all pairs of their activities are eventually
+        following in that direction and none in the other.
+        """
+        order = self.all_ef & self.no_ef.T
+        np.fill_diagonal(order, False)
+        po = BinaryRelation(self.groups)
+        for i, j in zip(*np.nonzero(order)):
+            po.add_edge_id(i, j)
+        return po
+
+    def is_valid_order(self, po: BinaryRelation) -> bool:
+        """
+        Checks that an order over the groups (in the same order as the groups) is a strict partial
+        order in which two groups are unordered iff all pairs of their activities are eventually
+        following in both directions, and in which the groups without predecessors (successors)
+        contain a start (end) activity.
+        """
+        if not po.is_strict_partial_order():
+            return False
+
+        edges = np.asarray(po.edges, dtype=bool)
+        ordered = edges | edges.T
+        concurrent = self.all_ef & self.all_ef.T
+        distinct = ~np.eye(len(self.groups), dtype=bool)
+        if (distinct & (ordered == concurrent)).any():
+            return False
+
+        start_blocks = ~edges.any(axis=0)
+        end_blocks = ~edges.any(axis=1)
+        return not (
+            (start_blocks & ~self.has_start).any() or (end_blocks & ~self.has_end).any()
+        )
@@ -0,0 +1,54 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from copy import deepcopy
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pm4py.algo.discovery.inductive.dtypes.im_ds import (
+    IMDataStructure,
+    IMDataStructureUVCL,
+)
+
+from powl.objects.obj import POWL
+
+DEFAULT_PARALLEL_RECURSION_THRESHOLD = 500
+
+
+class ParallelRecursion(Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def create_executor(mode: ParallelRecursion, max_workers: Optional[int]) -> Executor:
+    if mode is ParallelRecursion.THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    elif mode is ParallelRecursion.PROCESS:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        raise Exception("Invalid parallel recursion mode!")
+
+
+def sub_log_size(obj: IMDataStructure) -> int:
+    # mining cost grows with the number of events over the distinct variants (or DFG edges)
+    if isinstance(obj, IMDataStructureUVCL):
+        return sum(len(variant) for variant in obj.data_structure)
+    return len(obj.dfg.graph)
+
+
+def mine_sub_log(
+    miner_class: Type, obj: IMDataStructure, parameters: Dict[Any, Any]
+) -> Tuple[POWL, Any]:
+    """
+    Worker entry point: mines a sub-log sequentially with a fresh miner of the given class.
+
+    :return: the model and the discovery budget checked by the miner (if any)
+    """
+    miner = miner_class(parameters)
+    return miner.apply(obj, parameters=parameters), miner.budget
+
+
+def adopt(powl: POWL) -> POWL:
+    """
+    Rebuilds a model mined by a worker with fresh transition identifiers, as identifiers created in
+    another process may clash with local ones.
+    """
+    return deepcopy(powl)
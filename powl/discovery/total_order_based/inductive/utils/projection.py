@@ -0,0 +1,114 @@
+from collections import Counter
+from typing import Any, Collection, Dict, Hashable, List, Optional
+
+from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
+from pm4py.objects.dfg.obj import DFG
+from pm4py.util.compression.dtypes import UVCL
+
+
+def group_index(groups: List[Collection[Any]]) -> Dict[Hashable, int]:
+    index = {}
+    for i, group in enumerate(groups):
+        for activity in group:
+            index[activity] = i
+    return index
+
+
+def _add_trace(log: Counter, dfg: DFG, segment: List[Any], freq: int) -> None:
+    log[tuple(segment)] += freq
+    if segment:
+        dfg.start_activities[segment[0]] += freq
+        dfg.end_activities[segment[-1]] += freq
+
+
+def _to_children(logs: List[Counter], dfgs: List[DFG]) -> List[IMDataStructureUVCL]:
+    children = []
+    for log, dfg in zip(logs, dfgs):
+        # same order of the start/end activities as in a DFG discovered from the sub-log
+        for counter in (dfg.start_activities, dfg.end_activities):
+            items = sorted(counter.items())
+            counter.clear()
+            counter.update(dict(items))
+        children.append(IMDataStructureUVCL(log, dfg))
+    return children
+
+
+def project_on_groups(
+    log: UVCL, groups: List[Collection[Any]], keep_empty_traces: bool = True
+) -> List[IMDataStructureUVCL]:
+    """
+    Projects a log on every group at once: each variant is walked a single time and each event is
+    routed to the sub-log of its group (events of activities outside all groups are dropped). The
+    DFG of every sub-log is built in the same pass, so the children do not rediscover it.
+
+    :param log: variants and their frequencies
+    :param groups: groups of activities
+    :param keep_empty_traces: whether a variant without events of a group adds an empty trace to the
+        sub-log of that group
+    :return: one sub-log per group, in the order of the groups
+    """
+    index = group_index(groups)
+    k = len(groups)
+    logs = [Counter() for _ in range(k)]
+    dfgs = [DFG() for _ in range(k)]
+    for variant, freq in log.items():
+        segments = [[] for _ in range(k)]
+        for activity in variant:
+            i = index.get(activity)
+            if i is not None:
+                segment = segments[i]
+                if segment:
+                    dfgs[i].graph[(segment[-1], activity)] += freq
+                segment.append(activity)
+        for i in range(k):
+            if keep_empty_traces or segments[i]:
+                _add_trace(logs[i], dfgs[i], segments[i], freq)
+    return _to_children(logs, dfgs)
+
+
+def project_on_groups_splitting_reentries(
+    log: UVCL,
+    groups: List[Collection[Any]],
+    dfg_graph: Optional[Dict[Any, int]] = None,
+) -> List[IMDataStructureUVCL]:
+    """
+    Single-pass projection for cyclic groups: a trace that leaves a group and enters it again
+    starts a new trace in the sub-log of that group. If a DFG is given, the trace is only split if
+    the edge entering the group again is more frequent than the edge from the last event of the
+    group to the entered activity. As for project_on_groups, the DFGs of the sub-logs are built in
+    the same pass.
+
+    :param log: variants and their frequencies
+    :param groups: groups of activities
+    :param dfg_graph: directly-follows frequencies used to decide whether to split re-entries
+    :return: one sub-log per group (without empty traces), in the order of the groups
+    """
+    index = group_index(groups)
+    k = len(groups)
+    logs = [Counter() for _ in range(k)]
+    dfgs = [DFG() for _ in range(k)]
+    for variant, freq in log.items():
+        segments = [[] for _ in range(k)]
+        last = None
+        last_group = None
+        for activity in variant:
+            i = index.get(activity)
+            if i is not None:
+                segment = segments[i]
+                if segment and last_group != i:
+                    if (
+                        dfg_graph is None
+                        or dfg_graph.get((last, activity), 0)
+                        > dfg_graph.get((segment[-1], activity), 0)
+                    ):
+                        _add_trace(logs[i], dfgs[i], segment, freq)
+                        segment = segments[i] = []
+                if segment:
+                    dfgs[i].graph[(segment[-1], activity)] += freq
+                segment.append(activity)
+            last = activity
+            last_group = i
+        for i in range(k):
+            if segments[i]:
+                _add_trace(logs[i], dfgs[i], segments[i], freq)
+    return _to_children(logs, dfgs)
@@ -0,0 +1,85 @@
+from collections import namedtuple, OrderedDict
+from copy import deepcopy
+from typing import Any, Dict, Hashable, Optional
+
+from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
+
+from powl.discovery.total_order_based.inductive.utils.cut_context import CUT_CONTEXT
+from powl.objects.obj import POWL
+
+DEFAULT_CACHE_SIZE = 256
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((_freeze(k), _freeze(v)) for k, v in value.items())
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def fingerprint_parameters(parameters: Optional[Dict[Any, Any]]) -> Hashable:
+    if not parameters:
+        return frozenset()
+    return frozenset(
+        (_freeze(key), _freeze(value))
+        for key, value in parameters.items()
+        # the cut context is derived from the sub-log being cut
+        if key != CUT_CONTEXT
+    )
+
+
+def fingerprint_log(obj: IMDataStructureUVCL) -> Hashable:
+    # the variant multiset, independent of the order in which the variants were inserted
+    return frozenset(obj.data_structure.items())
+
+
+class SubLogCache:
+    """
+    Bounded LRU cache of the models mined for sub-logs. Every hit returns a private deep copy, so a
+    cached model never occurs twice in the discovered model. Entries are stored by reference, hence
+    the models returned by a miner must not be mutated (e.g. simplified) while the miner is still
+    used for discovery.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[POWL]:
+        powl = self._entries.get(key)
+        if powl is None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        self._entries.move_to_end(key)
+        return deepcopy(powl)
+
+    def put(self, key: Hashable, powl: POWL) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = powl
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
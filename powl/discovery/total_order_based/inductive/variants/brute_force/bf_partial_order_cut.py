@@ -6,28 +6,15 @@ from typing import Any, Collection, Dict, Generic, List, Optional, Tuple
 from pm4py.algo.discovery.inductive.cuts.abc import Cut, T
 
 from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
-from pm4py.objects.dfg import util as dfu
-from pm4py.statistics.eventually_follows.uvcl.get import apply as to_efg
+from pm4py.util import exec_utils
 
+from powl.discovery.total_order_based.inductive.utils.budget import BUDGET
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
+from powl.discovery.total_order_based.inductive.utils.group_order import GroupEFG
 from powl.objects.BinaryRelation import BinaryRelation
 from powl.objects.obj import POWL, StrictPartialOrder
 
 
-def remove(blocks, g):
-    res = []
-    for g2 in blocks:
-        if not g2.__str__().__eq__(g.__str__()):
-            res.append(g2)
-    return res
-
-
-def contains(blocks, g):
-    for g2 in blocks:
-        if g2.__str__().__eq__(g.__str__()):
-            return True
-    return False
-
-
 def xor(a, b):
     if a and not b:
         return True
@@ -37,116 +24,155 @@ def xor(a, b):
         return False
 
 
-def get_partitions_of_size_k(nodes, k=None):
-    n = len(nodes)
-    if k is not None:
-        if k < 1:
-            raise ValueError("Can't partition in a negative or zero number of groups")
-        elif k > n:
-            return
-
-    def set_partitions_helper(l, k):
-        length = len(l)
-        if k == 1:
-            yield [tuple(l)]
-        elif length == k:
-            yield [tuple([s]) for s in l]
-        else:
-            e, *M = l
-            for p in set_partitions_helper(M, k - 1):
-                yield [tuple([e]), *p]
-            for p in set_partitions_helper(M, k):
-                for i in range(len(p)):
-                    yield p[:i] + [tuple([e]) + p[i]] + p[i + 1 :]
-
-    if k is None:
-        for k in range(1, n + 1):
-            yield from set_partitions_helper(nodes, k)
-    else:
-        yield from set_partitions_helper(nodes, k)
+# relation of two activities a and b in the eventually-follows graph
+NONE = 0
+BEFORE = 1  # only a is eventually followed by b
+AFTER = 2  # only b is eventually followed by a
+BOTH = 3
 
 
-def partition(collection):
-    i = len(collection)
-    while i > 1:
-        for part in get_partitions_of_size_k(collection, i):
-            yield part
-        i = i - 1
-    return
+def get_efg_codes(alphabet, efg):
+    return [
+        [((a, b) in efg) * BEFORE + ((b, a) in efg) * AFTER for b in alphabet]
+        for a in alphabet
+    ]
 
 
-def generate_order(parts, efg):
-    nodes = parts
-    po = BinaryRelation(nodes)
-    for group_1, group_2 in combinations(nodes, 2):
-        all_ef_g1_g2 = True
-        all_ef_g2_g1 = True
-        none_ef_g1_g2 = True
-        none_ef_g2_g1 = True
-        for a in group_1:
-            for b in group_2:
-                if (a, b) in efg:
-                    none_ef_g1_g2 = False
-                else:
-                    all_ef_g1_g2 = False
-
-                if (b, a) in efg:
-                    none_ef_g2_g1 = False
-                else:
-                    all_ef_g2_g1 = False
-
-        if all_ef_g1_g2 and none_ef_g2_g1:
-            po.add_edge(group_1, group_2)
-        elif none_ef_g1_g2 and all_ef_g2_g1:
-            po.add_edge(group_2, group_1)
+def get_code_masks(codes):
+    # masks[a][r]: bitmask of the activities b with relation r between a and b
+    masks = []
+    for row in codes:
+        masks_of_a = [0, 0, 0, 0]
+        for b, relation in enumerate(row):
+            masks_of_a[relation] |= 1 << b
+        masks.append(masks_of_a)
+    return masks
 
-    return po
 
+def can_add_block(codes, masks, blocks, block_masks, items_mask, e):
+    # every pair of blocks must be ordered or concurrent, consistently over all their activities
+    before = 0  # the activities of the blocks ordered before e
+    after = 0  # the activities of the blocks ordered after e
+    for block, block_mask in zip(blocks, block_masks):
+        relation = codes[e][block[0]]
+        if relation == NONE or block_mask & ~masks[e][relation]:
+            return False
+        if relation == AFTER:
+            before |= block_mask
+        elif relation == BEFORE:
+            after |= block_mask
+    # the order must stay transitive over the triangles including the new block: the blocks
+    # before a block before e are before e, the blocks after a block after e are after e, and
+    # the blocks before e are before the blocks after e
+    for block, block_mask in zip(blocks, block_masks):
+        relation = codes[e][block[0]]
+        if relation == AFTER:
+            if masks[block[0]][AFTER] & items_mask & ~block_mask & ~before:
+                return False
+            if after & ~masks[block[0]][BEFORE]:
+                return False
+        elif relation == BEFORE:
+            if masks[block[0]][BEFORE] & items_mask & ~block_mask & ~after:
+                return False
+    return True
 
-def is_valid_order(po, dfg_graph, efg):
-    if not po.is_strict_partial_order():
-        return False
 
-    start_blocks = po.nodes
-    end_blocks = po.nodes
+def can_join_block(codes, masks, blocks, block_masks, i, e):
+    # the relations between the blocks are unchanged, so transitivity is preserved
+    representative = blocks[i][0]
+    for j, block in enumerate(blocks):
+        if j != i and block_masks[j] & ~masks[e][codes[representative][block[0]]]:
+            return False
+    return True
 
-    for group_1, group_2 in combinations(po.nodes, 2):
 
-        edge_g1_g2 = po.is_edge(group_1, group_2)
-        edge_g2_g1 = po.is_edge(group_2, group_1)
+def _consistent_partitions(codes, masks, items, k, budget):
+    # yields the partitions with the bitmasks of their blocks
+    if budget is not None:
+        budget.check()
+    if k == 1:
+        yield [tuple(items)], [sum(1 << e for e in items)]
+    elif len(items) == k:
+        blocks = []
+        block_masks = []
+        items_mask = 0
+        for e in reversed(items):
+            if not can_add_block(codes, masks, blocks, block_masks, items_mask, e):
+                return
+            blocks = [(e,)] + blocks
+            block_masks = [1 << e] + block_masks
+            items_mask |= 1 << e
+        yield blocks, block_masks
+    else:
+        e, *rest = items
+        items_mask = sum(1 << x for x in rest)
+        for blocks, block_masks in _consistent_partitions(
+            codes, masks, rest, k - 1, budget
+        ):
+            if can_add_block(codes, masks, blocks, block_masks, items_mask, e):
+                yield [(e,)] + blocks, [1 << e] + block_masks
+        for blocks, block_masks in _consistent_partitions(
+            codes, masks, rest, k, budget
+        ):
+            for i in range(len(blocks)):
+                if can_join_block(codes, masks, blocks, block_masks, i, e):
+                    yield (
+                        blocks[:i] + [(e,) + blocks[i]] + blocks[i + 1 :],
+                        block_masks[:i]
+                        + [block_masks[i] | 1 << e]
+                        + block_masks[i + 1 :],
+                    )
+
+
+def get_consistent_partitions(codes, items, k, budget=None):
+    """
+    Enumerates the partitions of the items into k blocks in the order of the classical recursive
+    set partition generator, skipping the partitions in which two blocks are neither ordered nor
+    concurrent or the order is not transitive. Adding activities to a partition cannot repair
+    these violations, hence the partitions of a suffix of the items are filtered before they are
+    extended and whole subtrees of the search are pruned. The blocks are checked as bitmasks of
+    activities against the bitmasks of the relations of every activity.
+    """
+    masks = get_code_masks(codes)
+    for blocks, _ in _consistent_partitions(codes, masks, items, k, budget):
+        yield blocks
+
+
+def covers_start_and_end(masks, blocks, block_masks, start_mask, end_mask):
+    # the blocks without predecessors (successors) must contain a start (end) activity
+    items_mask = 0
+    for block_mask in block_masks:
+        items_mask |= block_mask
+    for block, block_mask in zip(blocks, block_masks):
+        others = items_mask & ~block_mask
+        if not masks[block[0]][AFTER] & others and not block_mask & start_mask:
+            return False
+        if not masks[block[0]][BEFORE] & others and not block_mask & end_mask:
+            return False
+    return True
 
-        if edge_g1_g2:
-            start_blocks = remove(start_blocks, group_2)
-            end_blocks = remove(end_blocks, group_1)
-        if edge_g2_g1:
-            start_blocks = remove(start_blocks, group_1)
-            end_blocks = remove(end_blocks, group_2)
 
-        all_ef_g1_g2 = True
-        all_ef_g2_g1 = True
+def get_block_order(codes, blocks, parts):
+    """
+    Orders a block before another one if their activities are only eventually following in that
+    direction (the relations are uniform over the blocks of a consistent partition).
+    """
+    po = BinaryRelation(parts)
+    for i, block_i in enumerate(blocks):
+        for j, block_j in enumerate(blocks):
+            if i != j and codes[block_i[0]][block_j[0]] == BEFORE:
+                po.add_edge_id(i, j)
+    return po
 
-        for a in group_1:
-            for b in group_2:
-                if not (a, b) in efg:
-                    all_ef_g1_g2 = False
-                if not (b, a) in efg:
-                    all_ef_g2_g1 = False
-        if all_ef_g1_g2 and all_ef_g2_g1 and (edge_g1_g2 or edge_g2_g1):
-            return False
-        if not edge_g1_g2 and not edge_g2_g1 and not (all_ef_g1_g2 and all_ef_g2_g1):
-            return False
 
-    n = len(po.nodes)
-    for i in range(n):
-        group = po.nodes[i]
-        c1 = contains(start_blocks, group)
-        c2 = len(set(group).intersection(set(dfg_graph.start_activities.keys()))) > 0
-        c3 = contains(end_blocks, group)
-        c4 = len(set(group).intersection(set(dfg_graph.end_activities.keys()))) > 0
-        if (c1 and not c2) or (c3 and not c4):
-            return False
+def generate_order(parts, efg):
+    return GroupEFG(parts, efg).generate_order()
 
-    return True
+
+def is_valid_order(po, dfg_graph, efg):
+    return GroupEFG(
+        po.nodes, efg, dfg_graph.start_activities, dfg_graph.end_activities
+    ).is_valid_order(po)
 
 
 class BruteForcePartialOrderCut(Cut[T], ABC, Generic[T]):
@@ -160,13 +186,33 @@ class BruteForcePartialOrderCut(Cut[T], ABC, Generic[T]):
     def holds(
         cls, obj: T, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[BinaryRelation]:
-        dfg_graph = obj.dfg
-        efg = to_efg(obj)
-        alphabet = sorted(dfu.get_vertices(dfg_graph), key=lambda g: g.__str__())
-        for part in partition(alphabet):
-            po = generate_order(part, efg)
-            if is_valid_order(po, dfg_graph, efg):
-                return po
+        context = get_cut_context(obj, parameters)
+        alphabet = context.alphabet
+        # the number of partitions grows with the Bell number of the alphabet size
+        budget = exec_utils.get_param_value(BUDGET, parameters, None)
+        codes = get_efg_codes(alphabet, context.efg)
+        masks = get_code_masks(codes)
+        start_mask = sum(
+            1 << i for i, a in enumerate(alphabet) if a in context.start_activities
+        )
+        end_mask = sum(
+            1 << i for i, a in enumerate(alphabet) if a in context.end_activities
+        )
+        # partitions are tried from the finest to the coarsest one; the pruned search yields the
+        # same candidates in the same order as the exhaustive enumeration, so the first valid
+        # partition is unchanged. A consistent partition covering the start and end activities
+        # is valid, its order being read from the codes
+        for k in range(len(alphabet), 1, -1):
+            for blocks, block_masks in _consistent_partitions(
+                codes, masks, list(range(len(alphabet))), k, budget
+            ):
+                if covers_start_and_end(
+                    masks, blocks, block_masks, start_mask, end_mask
+                ):
+                    part = [tuple(alphabet[i] for i in block) for block in blocks]
+                    po = get_block_order(codes, blocks, part)
+                    if po.is_strict_partial_order():
+                        return po
         return None
 
     @classmethod
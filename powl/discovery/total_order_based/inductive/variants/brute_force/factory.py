@@ -38,8 +38,4 @@ class CutFactoryPOWLBruteForce(CutFactory):
     def find_cut(
         cls, obj: IMDataStructureUVCL, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[Tuple[POWL, List[T]]]:
-        for c in CutFactoryPOWLBruteForce.get_cuts(obj):
-            r = c.apply(obj, parameters)
-            if r is not None:
-                return r
-        return None
+        return cls.apply_cuts(CutFactoryPOWLBruteForce.get_cuts(obj), obj, parameters)
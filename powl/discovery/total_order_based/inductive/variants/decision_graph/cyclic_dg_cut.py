@@ -1,5 +1,4 @@
 from abc import ABC
-from collections import Counter
 from itertools import combinations
 from typing import Any, Collection, Dict, List, Optional
 
@@ -9,7 +8,11 @@ from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
 from pm4py.util import exec_utils
 from pm4py.algo.discovery.inductive.variants.imf import IMFParameters
 
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
 from powl.discovery.total_order_based.inductive.utils.filtering import FILTERING_TYPE, FilteringType
+from powl.discovery.total_order_based.inductive.utils.projection import (
+    project_on_groups_splitting_reentries,
+)
 from powl.discovery.total_order_based.inductive.variants.decision_graph.max_decision_graph_cut import (
     MaximalDecisionGraphCut
 )
@@ -22,7 +25,7 @@ class CyclicDecisionGraphCut(MaximalDecisionGraphCut[T], ABC):
     ) -> Optional[List[Any]]:
 
         dfg = obj.dfg
-        alphabet = parameters["alphabet"]
+        alphabet = get_cut_context(obj, parameters).alphabet
 
         groups = [frozenset([a]) for a in alphabet]
 
@@ -55,20 +58,6 @@ class CyclicDecisionGraphCutUVCL(CyclicDecisionGraphCut[IMDataStructureUVCL], AB
                 if noise_threshold > 0.0:
                     filtering = True
 
-        logs = [Counter() for _ in groups]
-        for t, freq in obj.data_structure.items():
-            for i, group in enumerate(groups):
-                seg = []
-                last = None
-                for e in t:
-                    if e in group:
-                        if len(seg) > 0 and last not in group:
-                            if not filtering or obj.dfg.graph.get((last, e), 0) > obj.dfg.graph.get((seg[-1], e), 0):
-                                logs[i][tuple(seg)] += freq
-                                seg = []
-                        seg.append(e)
-                    last = e
-                if len(seg) > 0:
-                    logs[i][tuple(seg)] += freq
-
-        return [IMDataStructureUVCL(l) for l in logs]
\ No newline at end of file
+        return project_on_groups_splitting_reentries(
+            obj.data_structure, groups, obj.dfg.graph if filtering else None
+        )
\ No newline at end of file
@@ -7,6 +7,7 @@ from pm4py.objects.dfg import util as dfu
 from pm4py.algo.discovery.inductive.cuts.abc import T
 from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
 
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
 from powl.discovery.total_order_based.inductive.variants.decision_graph.cyclic_dg_cut import (
     CyclicDecisionGraphCut,
     CyclicDecisionGraphCutUVCL,
@@ -20,7 +21,7 @@ class StrictCyclicDecisionGraphCut(CyclicDecisionGraphCut[T], ABC):
     ) -> Optional[List[Any]]:
 
         dfg = obj.dfg
-        alphabet = parameters["alphabet"]
+        alphabet = get_cut_context(obj, parameters).alphabet
         groups = [frozenset([a]) for a in alphabet]
 
         def _get_group(activity):
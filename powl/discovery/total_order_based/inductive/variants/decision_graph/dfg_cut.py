@@ -2,6 +2,7 @@ from typing import Any, Dict, List, Optional
 
 from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
 
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
 from powl.discovery.total_order_based.inductive.variants.decision_graph.cyclic_dg_cut import (
     CyclicDecisionGraphCutUVCL,
 )
@@ -14,6 +15,6 @@ class DFGCutUVCL(CyclicDecisionGraphCutUVCL):
         obj: IMDataStructureUVCL,
         parameters: Optional[Dict[str, Any]] = None,
     ) -> Optional[List[Any]]:
-        alphabet = parameters["alphabet"]
+        alphabet = get_cut_context(obj, parameters).alphabet
         print("alphabet: ", alphabet)
         return [frozenset([a]) for a in alphabet]
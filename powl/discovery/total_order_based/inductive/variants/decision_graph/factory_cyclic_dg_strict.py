@@ -5,13 +5,13 @@ from pm4py.algo.discovery.inductive.dtypes.im_ds import (
     IMDataStructureDFG,
     IMDataStructureUVCL,
 )
-from pm4py.objects.dfg import util as dfu
 
 from powl.discovery.total_order_based.inductive.cuts.concurrency import (
     POWLConcurrencyCutUVCL,
 )
 from powl.discovery.total_order_based.inductive.cuts.factory import CutFactory, T
 from powl.discovery.total_order_based.inductive.cuts.loop import POWLLoopCutUVCL
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
 from powl.discovery.total_order_based.inductive.variants.decision_graph.cyclic_dg_cut_strict import (
     StrictCyclicDecisionGraphCutUVCL,
 )
@@ -41,11 +41,9 @@ class CutFactoryCyclicDecisionGraphStrict(CutFactory):
     def find_cut(
         cls, obj: IMDataStructure, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[Tuple[POWL, List[T]]]:
-        alphabet = sorted(dfu.get_vertices(obj.dfg), key=lambda g: g.__str__())
-        if len(alphabet) < 2:
+        context = get_cut_context(obj, parameters)
+        if len(context.alphabet) < 2:
             return None
-        for c in CutFactoryCyclicDecisionGraphStrict.get_cuts(obj):
-            r = c.apply(obj, parameters)
-            if r is not None:
-                return r
-        return None
+        return cls.apply_cuts(
+            CutFactoryCyclicDecisionGraphStrict.get_cuts(obj), obj, parameters, context
+        )
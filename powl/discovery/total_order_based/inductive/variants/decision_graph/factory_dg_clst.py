@@ -1,10 +1,10 @@
 from typing import Any, Dict, List, Optional, Tuple
 
 from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructure
-from pm4py.objects.dfg import util as dfu
 
 from powl.discovery.total_order_based.inductive.cuts.factory import CutFactory, T
 from powl.discovery.total_order_based.inductive.cuts.loop import POWLLoopCutUVCL
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
 from powl.discovery.total_order_based.inductive.variants.decision_graph.max_decision_graph_cut import (
     MaximalDecisionGraphCutUVCL,
 )
@@ -27,11 +27,12 @@ class CutFactoryPOWLDecisionGraphClustering(CutFactory):
     def find_cut(
         cls, obj: IMDataStructure, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[Tuple[POWL, List[T]]]:
-        alphabet = sorted(dfu.get_vertices(obj.dfg), key=lambda g: g.__str__())
-        if len(alphabet) < 2:
+        context = get_cut_context(obj, parameters)
+        if len(context.alphabet) < 2:
             return None
-        for c in CutFactoryPOWLDecisionGraphClustering.get_cuts(obj):
-            r = c.apply(obj, parameters)
-            if r is not None:
-                return r
-        return None
+        return cls.apply_cuts(
+            CutFactoryPOWLDecisionGraphClustering.get_cuts(obj),
+            obj,
+            parameters,
+            context,
+        )
@@ -1,5 +1,4 @@
 from abc import ABC
-from collections import Counter
 from itertools import combinations
 from typing import Any, Collection, Dict, Generic, List, Optional, Tuple
 
@@ -11,10 +10,15 @@ from pm4py.algo.discovery.inductive.dtypes.im_ds import (
     IMDataStructureDFG,
     IMDataStructureUVCL,
 )
-from pm4py.objects.dfg import util as dfu
 from pm4py.objects.dfg.obj import DFG
 from pm4py.objects.process_tree.obj import Operator
 
+from powl.discovery.total_order_based.inductive.utils.cut_context import (
+    CUT_CONTEXT,
+    get_cut_context,
+    with_cut_context,
+)
+from powl.discovery.total_order_based.inductive.utils.projection import project_on_groups
 from powl.objects.BinaryRelation import BinaryRelation
 from powl.objects.obj import DecisionGraph, POWL
 
@@ -29,8 +33,9 @@ class MaximalDecisionGraphCut(Cut[T], ABC, Generic[T]):
         cls, obj: T, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[List[Any]]:
 
-        alphabet = parameters["alphabet"]
-        transitive_successors = parameters["transitive_successors"]
+        context = get_cut_context(obj, parameters)
+        alphabet = context.alphabet
+        transitive_successors = context.transitive_successors
 
         groups = [frozenset([a]) for a in alphabet]
 
@@ -51,17 +56,12 @@ class MaximalDecisionGraphCut(Cut[T], ABC, Generic[T]):
 
         dfg = obj.dfg
 
-        start_acts = set(obj.dfg.start_activities.keys())
-        end_acts = set(obj.dfg.end_activities.keys())
-
-        alphabet = sorted(dfu.get_vertices(dfg), key=lambda g: g.__str__())
-        transitive_predecessors, transitive_successors = dfu.get_transitive_relations(
-            dfg
-        )
-
-        parameters["alphabet"] = alphabet
-        parameters["transitive_predecessors"] = transitive_predecessors
-        parameters["transitive_successors"] = transitive_successors
+        # the context is shared with holds (and the cuts tried before) without writing the
+        # intermediate results into the parameters of the caller
+        parameters = with_cut_context(obj, parameters)
+        context = parameters[CUT_CONTEXT]
+        start_acts = context.start_activities
+        end_acts = context.end_activities
 
         groups = cls.holds(obj, parameters)
         if groups is None:
@@ -89,11 +89,6 @@ class MaximalDecisionGraphCut(Cut[T], ABC, Generic[T]):
             if ga != gb:
                 group_conn[ga][gb] = True
 
-        parameters["_mdgc_act_to_group"] = act_to_group
-        parameters["_mdgc_group_has_start"] = group_has_start
-        parameters["_mdgc_group_has_end"] = group_has_end
-        parameters["_mdgc_group_conn"] = group_conn
-
         children = cls.project(obj, groups, parameters)
 
         order = BinaryRelation(nodes=children)
@@ -119,17 +114,7 @@ class MaximalDecisionGraphCutUVCL(MaximalDecisionGraphCut[IMDataStructureUVCL],
         parameters: Optional[Dict[str, Any]] = None,
     ) -> List[IMDataStructureUVCL]:
 
-        logs = [Counter() for _ in groups]
-        for t, freq in obj.data_structure.items():
-            for i, group in enumerate(groups):
-                seg = []
-                for e in t:
-                    if e in group:
-                        seg.append(e)
-                if len(seg) > 0:
-                    logs[i][tuple(seg)] += freq
-
-        return [IMDataStructureUVCL(l) for l in logs]
+        return project_on_groups(obj.data_structure, groups, keep_empty_traces=False)
 
 
 class MaximalDecisionGraphCutDFG(MaximalDecisionGraphCut[IMDataStructureDFG], ABC):
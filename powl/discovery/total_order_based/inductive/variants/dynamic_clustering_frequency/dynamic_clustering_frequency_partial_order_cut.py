@@ -1,17 +1,20 @@
 from abc import ABC
-from collections import Counter
-from itertools import combinations, product
+from itertools import combinations
 from typing import Any, Collection, Dict, Generic, List, Optional, Tuple
 
-from pm4py.algo.discovery.inductive.cuts import utils as cut_util
-
 from pm4py.algo.discovery.inductive.cuts.abc import Cut, T
 from pm4py.algo.discovery.inductive.dtypes.im_ds import (
     IMDataStructureDFG,
     IMDataStructureUVCL,
 )
-from pm4py.objects.dfg import util as dfu
 
+from powl.discovery.total_order_based.inductive.utils.clustering import (
+    DynamicClustering,
+    PairFrequencies,
+    TraceFrequencies,
+)
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
+from powl.discovery.total_order_based.inductive.utils.eventually_follows import get_efg
 from powl.discovery.total_order_based.inductive.variants.maximal.maximal_partial_order_cut import (
     MaximalPartialOrderCutDFG,
     project_on_groups_with_unique_activities,
@@ -29,167 +32,23 @@ def generate_order(obj: T, clusters, order_frequency_ratio):
     if len(clusters) < 2:
         return None
 
-    # Step 1: Generate Order based on the EFG
-    po = BinaryRelation([tuple(c) for c in sorted(clusters)])
+    alphabet = [a for cluster in clusters for a in cluster]
+    index = {a: i for i, a in enumerate(alphabet)}
     if type(obj) is IMDataStructureUVCL:
-        efg_freq = compute_efg_frequencies(obj, groups=po.nodes)
+        frequencies = TraceFrequencies(obj.data_structure, index, get_efg(obj))
     elif type(obj) is IMDataStructureDFG:
-        efg_freq = compute_dfg_transitive_closure(obj.dfg.graph, groups=po.nodes)
+        closure = get_transitive_closure_from_counter(obj.dfg.graph)
+        frequencies = PairFrequencies.from_pairs(
+            {(a, b): 1 for a, bs in closure.items() for b in bs}, index
+        )
     else:
         raise NotImplementedError
 
-    changed = False
-    for i in range(len(po.nodes)):
-        cluster_1 = po.nodes[i]
-        for j in range(i + 1, len(po.nodes)):
-            cluster_2 = po.nodes[j]
-
-            sum_freq = (
-                efg_freq[(cluster_1, cluster_2)] + efg_freq[(cluster_2, cluster_1)]
-            )
-            if sum_freq > 0:
-                if (
-                    float(efg_freq[(cluster_1, cluster_2)]) / sum_freq
-                ) >= order_frequency_ratio:
-                    po.add_edge(cluster_1, cluster_2)
-                if (
-                    float(efg_freq[cluster_2, cluster_1]) / sum_freq
-                ) >= order_frequency_ratio:
-                    po.add_edge(cluster_2, cluster_1)
-
-    # Step 2: Ensure Transitivity and Irreflexivity
-    if not po.is_transitive():
-        n = len(po.nodes)
-        continue_loop = True
-        while continue_loop:
-            continue_loop = False
-            for i, j, k in product(range(n), range(n), range(n)):
-                if (
-                    i != j
-                    and j != k
-                    and po.edges[i][j]
-                    and po.edges[j][k]
-                    and not po.is_edge_id(i, k)
-                ):
-                    if (
-                        efg_freq[(po.nodes[k], po.nodes[i])]
-                        + efg_freq[(po.nodes[i], po.nodes[k])]
-                        == 0
-                    ):
-                        po.edges[i][k] = True
-                        continue_loop = True
-                    else:
-                        clusters = cut_util.merge_lists_based_on_activities(
-                            po.nodes[i][0], po.nodes[k][0], clusters
-                        )
-                        return generate_order(obj, clusters, order_frequency_ratio)
-
-    if not po.is_irreflexive():
-        for i in range(len(po.nodes)):
-            cluster_1 = po.nodes[i]
-            for j in range(i + 1, len(po.nodes)):
-                cluster_2 = po.nodes[j]
-                if po.is_edge(cluster_1, cluster_2) and po.is_edge(
-                    cluster_2, cluster_1
-                ):
-                    clusters = cut_util.merge_lists_based_on_activities(
-                        cluster_1[0], cluster_2[0], clusters
-                    )
-                    changed = True
-
-    if changed:
-        return generate_order(obj, clusters, order_frequency_ratio)
-
-    # # Step 3: Detect Choice
-    for i in range(len(po.nodes)):
-        cluster_1 = po.nodes[i]
-        for j in range(i + 1, len(po.nodes)):
-            cluster_2 = po.nodes[j]
-            if (
-                not po.is_edge(cluster_1, cluster_2)
-                and not po.is_edge(cluster_2, cluster_1)
-                and efg_freq[(cluster_1, cluster_2)] == 0
-                and efg_freq[(cluster_2, cluster_1)] == 0
-            ):
-                clusters = cut_util.merge_lists_based_on_activities(
-                    cluster_1[0], cluster_2[0], clusters
-                )
-                changed = True
-
-    if changed:
-        return generate_order(obj, clusters, order_frequency_ratio)
-
-    # Step 4: Cluster nodes sharing the same pre- and post-sets.
-    pre = {node: [] for node in po.nodes}
-    post = {node: [] for node in po.nodes}
-    for i in range(len(po.nodes)):
-        cluster_1 = po.nodes[i]
-        for j in range(i + 1, len(po.nodes)):
-            cluster_2 = po.nodes[j]
-            if po.is_edge(cluster_1, cluster_2):
-                pre[cluster_2].append(cluster_1)
-                post[cluster_1].append(cluster_2)
-            elif po.is_edge(cluster_2, cluster_1):
-                pre[cluster_1].append(cluster_2)
-                post[cluster_2].append(cluster_1)
-
-    for i in range(len(po.nodes)):
-        cluster_1 = po.nodes[i]
-        for j in range(i + 1, len(po.nodes)):
-            cluster_2 = po.nodes[j]
-            if pre[cluster_1] == pre[cluster_2] and post[cluster_1] == post[cluster_2]:
-                clusters = cut_util.merge_lists_based_on_activities(
-                    cluster_1[0], cluster_2[0], clusters
-                )
-                changed = True
-
-    if changed and len(clusters) > 1:
-        return generate_order(obj, clusters, order_frequency_ratio)
-    else:
-        return po
-
-
-def compute_efg_frequencies(
-    interval_log: IMDataStructureUVCL, groups
-) -> Dict[Tuple[str, str], int]:
-    res = {(g1, g2): 0 for g1 in groups for g2 in groups}
-
-    activity_to_cluster = {}
-    for cluster in groups:
-        for activity in cluster:
-            activity_to_cluster[activity] = cluster
-
-    for trace, freq in interval_log.data_structure.items():
-        seen_pairs = set()
-        for i in range(len(trace)):
-            cluster_1 = activity_to_cluster.get(trace[i])
-            for j in range(i + 1, len(trace)):
-                cluster_2 = activity_to_cluster.get(trace[j])
-                pair = (cluster_1, cluster_2)
-                if pair not in seen_pairs:
-                    res[pair] += freq
-                    seen_pairs.add(pair)
-    return res
-
-
-def compute_dfg_transitive_closure(dfg: Counter, groups) -> Dict[Tuple[str, str], int]:
-
-    closure = get_transitive_closure_from_counter(dfg)
-
-    activity_to_cluster = {}
-    for cluster in groups:
-        for activity in cluster:
-            activity_to_cluster[activity] = cluster
-
-    result = {(g1, g2): 0 for g1 in groups for g2 in groups}
-    for a, bs in closure.items():
-        for b in bs:
-            cluster_1 = activity_to_cluster.get(a)
-            cluster_2 = activity_to_cluster.get(b)
-            pair = (cluster_1, cluster_2)
-            result[pair] += 1  # count is just existence
-
-    return result
+    clustering = DynamicClustering(alphabet, frequencies, order_frequency_ratio)
+    for cluster in clusters:
+        for a in cluster[1:]:
+            clustering.merge(index[cluster[0]], index[a])
+    return clustering.generate_order()
 
 
 class DynamicClusteringFrequencyPartialOrderCut(Cut[T], ABC, Generic[T]):
@@ -203,7 +62,7 @@ class DynamicClusteringFrequencyPartialOrderCut(Cut[T], ABC, Generic[T]):
     def holds(
         cls, obj: T, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[BinaryRelation]:
-        alphabet = sorted(dfu.get_vertices(obj.dfg), key=lambda g: g.__str__())
+        alphabet = get_cut_context(obj, parameters).alphabet
         clusters = [[a] for a in alphabet]
 
         if ORDER_FREQUENCY_RATIO in parameters.keys():
@@ -1,12 +1,23 @@
-import os
 from abc import ABC
+from concurrent.futures import Executor
 from enum import Enum
 from itertools import combinations
-from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
 from pm4py.algo.discovery.inductive.fall_through.empty_traces import EmptyTracesUVCL
 from pm4py.algo.discovery.inductive.variants.imf import IMFParameters
+from pm4py.objects.dfg import util as dfu
 from pm4py.objects.process_tree.obj import Operator
 from pm4py.util import constants, exec_utils
 
@@ -18,12 +29,40 @@ from powl.discovery.total_order_based.inductive.fall_through.empty_traces import
 from powl.discovery.total_order_based.inductive.fall_through.factory import (
     FallThroughFactory,
 )
+from powl.discovery.total_order_based.inductive.fall_through.flower import (
+    POWLFlowerModelDFG,
+    POWLFlowerModelUVCL,
+)
+from powl.discovery.total_order_based.inductive.utils.budget import (
+    BudgetExhausted,
+    DiscoveryBudget,
+)
+from powl.discovery.total_order_based.inductive.utils.executor import (
+    DiscoveryExecutor,
+)
 from powl.discovery.total_order_based.inductive.utils.filtering import (
-    filter_most_frequent_variants,
-    filter_most_frequent_variants_with_decreasing_factor,
     FILTERING_THRESHOLD,
     FILTERING_TYPE,
     FilteringType,
+    VariantFrequencyIndex,
+)
+from powl.discovery.total_order_based.inductive.utils.parallel_recursion import (
+    adopt,
+    create_executor,
+    DEFAULT_PARALLEL_RECURSION_THRESHOLD,
+    mine_sub_log,
+    ParallelRecursion,
+    sub_log_size,
+)
+from powl.discovery.total_order_based.inductive.utils.sub_log_cache import (
+    CacheInfo,
+    DEFAULT_CACHE_SIZE,
+    fingerprint_log,
+    fingerprint_parameters,
+    SubLogCache,
+)
+from powl.discovery.total_order_based.inductive.variants.maximal.factory import (
+    CutFactoryPOWLMaximal,
 )
 from powl.discovery.total_order_based.inductive.variants.powl_discovery_varaints import (
     POWLDiscoveryVariant,
@@ -43,29 +82,95 @@ T = TypeVar("T", bound=IMDataStructureUVCL)
 
 class Parameters(Enum):
     MULTIPROCESSING = "multiprocessing"
+    # maximum number of sub-log models kept by the mining cache (0 disables the cache)
+    SUB_LOG_CACHE_SIZE = "sub_log_cache_size"
+    # ParallelRecursion mode used to mine independent children of a cut concurrently (None: off)
+    PARALLEL_RECURSION = "parallel_recursion"
+    # minimum size (events over the distinct variants) of a sub-log to be mined by a worker
+    PARALLEL_RECURSION_THRESHOLD = "parallel_recursion_threshold"
+    PARALLEL_RECURSION_WORKERS = "parallel_recursion_workers"
+    # mine integer-encoded activities and restore the labels on the discovered model
+    ENCODE_ACTIVITIES = "encode_activities"
+    # DiscoveryBudget bounding the discovery (None: unbounded)
+    BUDGET = "budget"
 
 
 class IMBasePOWL(ABC, Generic[T]):
-    def __init__(self, parameters: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        parameters: Optional[Dict[str, Any]] = None,
+        executor: Optional[DiscoveryExecutor] = None,
+    ):
+        """
+        :param parameters: parameters of the algorithm
+        :param executor: shared worker pools; without one, the miner creates private pools when
+            multiprocessing is enabled, which are shut down by ``close``
+        """
         if parameters is None:
             parameters = {}
 
         enable_multiprocessing = exec_utils.get_param_value(
             Parameters.MULTIPROCESSING,
             parameters,
-            constants.ENABLE_MULTIPROCESSING_DEFAULT,
+            executor is not None or constants.ENABLE_MULTIPROCESSING_DEFAULT,
         )
 
-        if enable_multiprocessing:
-            from multiprocessing import Manager, Pool
+        self._owns_executor = executor is None and enable_multiprocessing
+        if self._owns_executor:
+            executor = DiscoveryExecutor()
+        self._executor = executor
 
-            self._pool = Pool(os.cpu_count() - 1)
-            self._manager = Manager()
-            self._manager.support_list = []
+        if enable_multiprocessing:
+            self._pool, self._manager = executor.get_pool()
         else:
             self._pool = None
             self._manager = None
 
+        self._cache = SubLogCache(
+            exec_utils.get_param_value(
+                Parameters.SUB_LOG_CACHE_SIZE, parameters, DEFAULT_CACHE_SIZE
+            )
+        )
+
+        parallel_recursion = exec_utils.get_param_value(
+            Parameters.PARALLEL_RECURSION,
+            parameters,
+            executor.parallel_recursion if executor is not None else None,
+        )
+        # exec_utils unrolls enum values, so the mode is restored from its value
+        self._parallel_recursion = (
+            ParallelRecursion(parallel_recursion)
+            if parallel_recursion is not None
+            else None
+        )
+        self._parallel_recursion_threshold = exec_utils.get_param_value(
+            Parameters.PARALLEL_RECURSION_THRESHOLD,
+            parameters,
+            DEFAULT_PARALLEL_RECURSION_THRESHOLD,
+        )
+        self._parallel_recursion_workers = exec_utils.get_param_value(
+            Parameters.PARALLEL_RECURSION_WORKERS, parameters, None
+        )
+
+        self._budget = exec_utils.get_param_value(Parameters.BUDGET, parameters, None)
+        if self._budget is not None:
+            self._budget.start()
+
+    def close(self) -> None:
+        # pools created by the miner itself are shut down, shared executors are left to their owner
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    @property
+    def budget(self) -> Optional[DiscoveryBudget]:
+        return self._budget
+
+    def cache_info(self) -> CacheInfo:
+        return self._cache.info()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
     def instance(self) -> POWLDiscoveryVariant:
         return POWLDiscoveryVariant.TREE
 
@@ -81,34 +186,75 @@ class IMBasePOWL(ABC, Generic[T]):
         parameters: Optional[Dict[str, Any]] = None,
         second_iteration: bool = False,
     ) -> POWL:
+        if self._cache.maxsize <= 0 or len(dfu.get_vertices(obj.dfg)) <= 1:
+            # empty and single-activity logs are cheaper to mine than to copy
+            return self._mine_within_budget(obj, parameters, second_iteration)
 
-        noise_threshold = exec_utils.get_param_value(
-            IMFParameters.NOISE_THRESHOLD, parameters, 0.0
+        # identical sub-logs recur across the recursion and the filtering iterations
+        key = (
+            fingerprint_log(obj),
+            second_iteration,
+            fingerprint_parameters(parameters),
         )
+        powl = self._cache.get(key)
+        if powl is None:
+            powl = self._mine_within_budget(obj, parameters, second_iteration)
+            self._cache.put(key, powl)
+        return powl
 
-        empty_traces = self.empty_traces_cut().apply(obj, parameters)
-        if empty_traces is not None:
-            number_original_traces = sum(y for y in obj.data_structure.values())
-            number_filtered_traces = sum(
-                y for y in empty_traces[1][-1].data_structure.values()
-            )
+    def _mine_within_budget(
+        self,
+        obj: T,
+        parameters: Optional[Dict[str, Any]] = None,
+        second_iteration: bool = False,
+        mine: Optional[Callable[[], Optional[POWL]]] = None,
+    ) -> Optional[POWL]:
+        """
+        :param mine: mines the sub-log with the full variant (defaults to _mine)
+        """
+        if mine is None:
+            mine = lambda: self._mine(obj, parameters, second_iteration)
+        if self._budget is None:
+            return mine()
+        if self._budget.charge():
+            try:
+                return mine()
+            except BudgetExhausted:
+                pass
+        activities = dfu.get_vertices(obj.dfg)
+        if activities:
+            # logs without activities are mined exactly by the base cases
+            self._budget.record(activities)
+        return self._approximate(obj, parameters)
 
-            if (
-                number_original_traces - number_filtered_traces
-                > noise_threshold * number_original_traces
-            ):
-                return self._recurse(empty_traces[0], empty_traces[1], parameters)
+    def _approximate(
+        self, obj: T, parameters: Optional[Dict[str, Any]] = None
+    ) -> POWL:
+        """
+        Cheap discovery for sub-logs beyond the budget: empty traces, the base cases, the base IM cuts
+        and the maximal partial order cut, and the flower model if none of them applies.
+        """
+        cut = self.empty_traces_cut().apply(obj, parameters)
+        if cut is None:
+            powl = self.apply_base_cases(obj, parameters)
+            if powl is not None:
+                return powl
+            cut = CutFactoryPOWLMaximal.find_cut(obj, parameters=parameters)
+        if cut is None:
+            if type(obj) is IMDataStructureUVCL:
+                cut = POWLFlowerModelUVCL.apply(obj, parameters=parameters)
             else:
-                obj = empty_traces[1][-1]
-
-        powl = self.apply_base_cases(obj, parameters)
-        if powl is not None:
-            return powl
-
-        cut = self.find_cut(obj, parameters)
-        if cut is not None:
-            powl = self._recurse(cut[0], cut[1], parameters=parameters)
+                cut = POWLFlowerModelDFG.apply(obj, parameters=parameters)
+        children = [self._approximate(child, parameters) for child in cut[1]]
+        return self._compose(cut[0], cut[1], children)
 
+    def _mine(
+        self,
+        obj: T,
+        parameters: Optional[Dict[str, Any]] = None,
+        second_iteration: bool = False,
+    ) -> POWL:
+        powl, obj = self._mine_without_filtering(obj, parameters)
         if powl is not None:
             return powl
 
@@ -130,9 +276,7 @@ class IMBasePOWL(ABC, Generic[T]):
                         return tree
 
             elif filtering_type is FilteringType.DYNAMIC:
-                filtered_log = filter_most_frequent_variants(obj.data_structure)
-                if len(filtered_log.data_structure) > 0:
-                    return self.apply(filtered_log, parameters=parameters)
+                return self._mine_with_dynamic_filtering(obj, parameters)
 
             elif filtering_type is FilteringType.DECREASING_FACTOR:
                 if FILTERING_THRESHOLD in parameters.keys():
@@ -140,10 +284,11 @@ class IMBasePOWL(ABC, Generic[T]):
                     if isinstance(t, float) and 0 <= t < 1:
                         t = [t]
                     if isinstance(t, list):
+                        index = VariantFrequencyIndex(obj.data_structure)
                         for factor in t:
                             if factor > 0:
-                                filtered_log = filter_most_frequent_variants_with_decreasing_factor(
-                                    obj.data_structure, decreasing_factor=factor
+                                filtered_log = IMDataStructureUVCL(
+                                    index.with_decreasing_factor(factor)
                                 )
                                 if len(filtered_log.data_structure) == 0:
                                     break
@@ -161,6 +306,75 @@ class IMBasePOWL(ABC, Generic[T]):
         ft = self.fall_through(obj, parameters)
         return self._recurse(ft[0], ft[1], parameters=parameters)
 
+    def _mine_without_filtering(
+        self, obj: T, parameters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Optional[POWL], T]:
+        """
+        Tries the empty traces, the base cases and the cuts on a sub-log.
+
+        :return: the model (None if none of them applies) and the sub-log, without its empty traces
+            if they are filtered as noise
+        """
+        noise_threshold = exec_utils.get_param_value(
+            IMFParameters.NOISE_THRESHOLD, parameters, 0.0
+        )
+
+        empty_traces = self.empty_traces_cut().apply(obj, parameters)
+        if empty_traces is not None:
+            number_original_traces = sum(y for y in obj.data_structure.values())
+            number_filtered_traces = sum(
+                y for y in empty_traces[1][-1].data_structure.values()
+            )
+
+            if (
+                number_original_traces - number_filtered_traces
+                > noise_threshold * number_original_traces
+            ):
+                return (
+                    self._recurse(empty_traces[0], empty_traces[1], parameters),
+                    obj,
+                )
+            else:
+                obj = empty_traces[1][-1]
+
+        powl = self.apply_base_cases(obj, parameters)
+        if powl is not None:
+            return powl, obj
+
+        cut = self.find_cut(obj, parameters)
+        if cut is not None:
+            powl = self._recurse(cut[0], cut[1], parameters=parameters)
+
+        return powl, obj
+
+    def _mine_with_dynamic_filtering(
+        self, obj: T, parameters: Optional[Dict[str, Any]] = None
+    ) -> POWL:
+        """
+        Removes the least frequent variants, one frequency level at a time, until the empty
+        traces, a base case or a cut apply to the remaining log; the fall-through is applied on the
+        last non-empty one. The levels are taken from a frequency index built once for the sub-log,
+        and are tried in place instead of re-entering apply once per level (each level is still
+        charged to the discovery budget).
+        """
+        index = VariantFrequencyIndex(obj.data_structure)
+        # filtering the variants above the highest frequency leaves an empty log
+        for frequency in index.frequencies[:-1]:
+            # the empty traces of the sub-log have already been handled, so the filtered logs
+            # contain none
+            filtered_log = IMDataStructureUVCL(index.above(frequency))
+            powl = self._mine_within_budget(
+                filtered_log,
+                parameters,
+                mine=lambda: self._mine_without_filtering(filtered_log, parameters)[0],
+            )
+            if powl is not None:
+                return powl
+            obj = filtered_log
+
+        ft = self.fall_through(obj, parameters)
+        return self._recurse(ft[0], ft[1], parameters=parameters)
+
     def apply_base_cases(
         self, obj: T, parameters: Optional[Dict[str, Any]] = None
     ) -> Optional[POWL]:
@@ -182,10 +396,71 @@ class IMBasePOWL(ABC, Generic[T]):
             parameters=parameters,
         )
 
+    def _mine_children(
+        self, objs: List[T], parameters: Optional[Dict[str, Any]] = None
+    ) -> List[POWL]:
+        offloaded = []
+        if self._parallel_recursion is not None:
+            offloaded = [
+                i
+                for i, obj in enumerate(objs)
+                if sub_log_size(obj) >= self._parallel_recursion_threshold
+            ]
+        if len(offloaded) < 2:
+            return [self.apply(obj, parameters=parameters) for obj in objs]
+
+        # workers mine their sub-logs sequentially, each with a private copy of the parameters
+        worker_parameters = dict(parameters) if parameters is not None else {}
+        worker_parameters[Parameters.PARALLEL_RECURSION] = None
+        worker_parameters[Parameters.MULTIPROCESSING] = False
+
+        # small sub-logs are mined before the workers start and the offloaded results are adopted
+        # in a fixed order once all of them are done, so that the transition identifiers (and thus
+        # the discovered model) do not depend on scheduling
+        children = [
+            None if i in offloaded else self.apply(obj, parameters=parameters)
+            for i, obj in enumerate(objs)
+        ]
+        if self._executor is not None and self._parallel_recursion_workers is None:
+            results = self._mine_offloaded(
+                self._executor.get_recursion_executor(self._parallel_recursion),
+                objs,
+                offloaded,
+                worker_parameters,
+            )
+        else:
+            with create_executor(
+                self._parallel_recursion, self._parallel_recursion_workers
+            ) as executor:
+                results = self._mine_offloaded(
+                    executor, objs, offloaded, worker_parameters
+                )
+        for i, (powl, budget) in zip(offloaded, results):
+            children[i] = adopt(powl)
+            if budget is not None and budget is not self._budget:
+                # a worker process checked a copy of the budget
+                self._budget.merge(budget)
+        return children
+
+    def _mine_offloaded(
+        self,
+        executor: Executor,
+        objs: List[T],
+        offloaded: List[int],
+        worker_parameters: Dict[str, Any],
+    ) -> List[POWL]:
+        futures = [
+            executor.submit(mine_sub_log, type(self), objs[i], dict(worker_parameters))
+            for i in offloaded
+        ]
+        return [future.result() for future in futures]
+
     def _recurse(
         self, powl: POWL, objs: List[T], parameters: Optional[Dict[str, Any]] = None
     ):
-        children = [self.apply(obj, parameters=parameters) for obj in objs]
+        return self._compose(powl, objs, self._mine_children(objs, parameters))
+
+    def _compose(self, powl: POWL, objs: List[T], children: List[POWL]) -> POWL:
         if isinstance(powl, StrictPartialOrder):
             if isinstance(powl, Sequence):
                 return Sequence(children)
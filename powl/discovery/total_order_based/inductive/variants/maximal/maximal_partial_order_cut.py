@@ -9,18 +9,19 @@ from pm4py.algo.discovery.inductive.dtypes.im_ds import (
     IMDataStructureDFG,
     IMDataStructureUVCL,
 )
-from pm4py.objects.dfg import util as dfu
 from pm4py.objects.dfg.obj import DFG
-from pm4py.objects.dfg.util import get_transitive_relations
 
 from pm4py.algo.discovery.inductive.variants.imf import IMFParameters
 from pm4py.util import exec_utils
+from powl.discovery.total_order_based.inductive.utils.cut_context import get_cut_context
 from powl.discovery.total_order_based.inductive.utils.filtering import (
     FILTERING_THRESHOLD,
     FILTERING_TYPE,
     FilteringType,
 )
+from powl.discovery.total_order_based.inductive.utils.group_order import GroupEFG
 
+from powl.discovery.total_order_based.inductive.utils.projection import project_on_groups
 from powl.general_utils.efg_frequency_filtering import filter_efg_based_on_filtered_dfg
 from powl.objects.BinaryRelation import BinaryRelation
 from powl.objects.obj import POWL, StrictPartialOrder
@@ -38,21 +39,6 @@ def generate_initial_order(nodes, efg):
     return po
 
 
-def remove(blocks, g):
-    res = []
-    for g2 in blocks:
-        if not g2.__str__().__eq__(g.__str__()):
-            res.append(g2)
-    return res
-
-
-def contains(blocks, g):
-    for g2 in blocks:
-        if g2.__str__().__eq__(g.__str__()):
-            return True
-    return False
-
-
 def is_valid_order(po, efg, start_activities, end_activities):
     if po is None:
         return False
@@ -60,49 +46,7 @@ def is_valid_order(po, efg, start_activities, end_activities):
     if len(po.nodes) < 2:
         return False
 
-    if not po.is_strict_partial_order():
-        return False
-
-    start_blocks = po.nodes
-    end_blocks = po.nodes
-
-    for group_1, group_2 in combinations(po.nodes, 2):
-
-        edge_g1_g2 = po.is_edge(group_1, group_2)
-        edge_g2_g1 = po.is_edge(group_2, group_1)
-
-        if edge_g1_g2:
-            start_blocks = remove(start_blocks, group_2)
-            end_blocks = remove(end_blocks, group_1)
-        if edge_g2_g1:
-            start_blocks = remove(start_blocks, group_1)
-            end_blocks = remove(end_blocks, group_2)
-
-        all_ef_g1_g2 = True
-        all_ef_g2_g1 = True
-
-        for a in group_1:
-            for b in group_2:
-                if not (a, b) in efg:
-                    all_ef_g1_g2 = False
-                if not (b, a) in efg:
-                    all_ef_g2_g1 = False
-        if all_ef_g1_g2 and all_ef_g2_g1 and (edge_g1_g2 or edge_g2_g1):
-            return False
-        if not edge_g1_g2 and not edge_g2_g1 and not (all_ef_g1_g2 and all_ef_g2_g1):
-            return False
-
-    n = len(po.nodes)
-    for i in range(n):
-        group = po.nodes[i]
-        c1 = contains(start_blocks, group)
-        c2 = len(set(group).intersection(start_activities)) > 0
-        c3 = contains(end_blocks, group)
-        c4 = len(set(group).intersection(end_activities)) > 0
-        if (c1 and not c2) or (c3 and not c4):
-            return False
-
-    return True
+    return GroupEFG(po.nodes, efg, start_activities, end_activities).is_valid_order(po)
 
 
 def cluster_order(binary_relation):
@@ -158,7 +102,8 @@ class MaximalPartialOrderCut(Cut[T], ABC, Generic[T]):
     ) -> Optional[BinaryRelation]:
 
         dfg = obj.dfg
-        alphabet = sorted(dfu.get_vertices(dfg), key=lambda g: g.__str__())
+        context = get_cut_context(obj, parameters)
+        alphabet = context.alphabet
         noise_threshold = None
         if FILTERING_TYPE in parameters.keys():
             filtering_type = parameters[FILTERING_TYPE]
@@ -168,19 +113,20 @@ class MaximalPartialOrderCut(Cut[T], ABC, Generic[T]):
                 )
 
         if type(obj) is IMDataStructureUVCL:
-            efg = filter_efg_based_on_filtered_dfg(obj, alphabet, dfg, noise_threshold)
+            efg = filter_efg_based_on_filtered_dfg(
+                obj, alphabet, dfg, noise_threshold, context.transitive_successors
+            )
         elif type(obj) is IMDataStructureDFG:
-            _, post_sets = get_transitive_relations(dfg)
-            efg = get_efg(post_sets)
+            efg = get_efg(context.transitive_successors)
         else:
             raise NotImplementedError
 
         po = generate_initial_order(alphabet, efg)
         clustered_po = cluster_order(po)
 
-        start_activities = set(list(dfg.start_activities.keys()))
-        end_activities = set(list(dfg.end_activities.keys()))
-        if is_valid_order(clustered_po, efg, start_activities, end_activities):
+        if is_valid_order(
+            clustered_po, efg, context.start_activities, context.end_activities
+        ):
             return clustered_po
         else:
             return None
@@ -205,21 +151,7 @@ class MaximalPartialOrderCut(Cut[T], ABC, Generic[T]):
 def project_on_groups_with_unique_activities(
     log: Counter, groups: List[Collection[Any]]
 ):
-    r = list()
-    for g in groups:
-        new_log = Counter()
-        for var, freq in log.items():
-            new_var = []
-            for activity in var:
-                if activity in g:
-                    new_var.append(activity)
-            new_var_tuple = tuple(new_var)
-            if new_var_tuple in new_log.keys():
-                new_log[new_var_tuple] = new_log[new_var_tuple] + freq
-            else:
-                new_log[new_var_tuple] = freq
-        r.append(new_log)
-    return list(map(lambda l: IMDataStructureUVCL(l), r))
+    return project_on_groups(log, groups)
 
 
 class MaximalPartialOrderCutUVCL(MaximalPartialOrderCut[IMDataStructureUVCL]):
@@ -0,0 +1,106 @@
+from typing import List, Optional
+
+import pandas as pd
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+
+def is_columnar_file(path: str) -> bool:
+    return path.endswith(PARQUET_EXTENSIONS + ARROW_EXTENSIONS)
+
+
+def discovery_columns(
+    available: List[str],
+    activity_key: str = "concept:name",
+    timestamp_key: Optional[str] = "time:timestamp",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: Optional[str] = "lifecycle:transition",
+) -> List[str]:
+    """
+    :return: the columns read by the discovery (the case identifier, activity, timestamp and
+        lifecycle transition), in the order of the file; the lifecycle transition is optional
+    """
+    for key in (activity_key, case_id_key, timestamp_key):
+        if key is not None and key not in available:
+            raise ValueError(f"Column {key} not found in table!")
+    keys = {activity_key, timestamp_key, case_id_key, lifecycle_key}
+    return [column for column in available if column in keys]
+
+
+def _open_arrow(path: str):
+    import pyarrow as pa
+
+    # the buffers of the columns stay in the mapped file until they are converted
+    source = pa.memory_map(path, "r")
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def read_column_names(path: str) -> List[str]:
+    if path.endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path, memory_map=True).names
+    return _open_arrow(path).schema.names
+
+
+def _read_table(path: str, columns: List[str], dictionary_columns: List[str]):
+    import pyarrow as pa
+
+    dictionary_columns = [c for c in dictionary_columns if c in columns]
+    if path.endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+
+        # only the column chunks of the selected columns are read
+        return pq.read_table(
+            path,
+            columns=columns,
+            memory_map=True,
+            read_dictionary=dictionary_columns,
+        )
+    table = _open_arrow(path).read_all().select(columns)
+    for column in dictionary_columns:
+        i = table.column_names.index(column)
+        if not pa.types.is_dictionary(table.schema.field(i).type):
+            table = table.set_column(i, column, table.column(i).dictionary_encode())
+    return table
+
+
+def read_columnar_event_log(
+    path: str,
+    columns: Optional[List[str]] = None,
+    activity_key: str = "concept:name",
+    timestamp_key: Optional[str] = "time:timestamp",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: Optional[str] = "lifecycle:transition",
+) -> pd.DataFrame:
+    """
+    Reads a Parquet or Arrow IPC (Feather) event log through a memory mapping of the file. Only the
+    given columns are read, by default the ones needed for the discovery (see discovery_columns).
+    The activities (and lifecycle transitions) are dictionary-encoded, i.e. categorical columns of
+    the dataframe, and timestamps stored as strings are parsed.
+
+    :param columns: the columns to read; None for the discovery columns
+    """
+    available = read_column_names(path)
+    if columns is None:
+        columns = discovery_columns(
+            available, activity_key, timestamp_key, case_id_key, lifecycle_key
+        )
+    else:
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in table!")
+
+    dictionary_columns = [c for c in (activity_key, lifecycle_key) if c is not None]
+    df = _read_table(path, columns, dictionary_columns).to_pandas()
+
+    if timestamp_key in df.columns and not pd.api.types.is_datetime64_any_dtype(
+        df[timestamp_key]
+    ):
+        df[timestamp_key] = pd.to_datetime(df[timestamp_key])
+    return df
@@ -123,12 +123,13 @@ def _widest_parents_multi_source(sources, out_adj, edge_weight):
     width = {s: math.inf for s in sources}
     parent = {s: None for s in sources}
 
-    # max-heap via negative keys
-    heap = [(-width[s], s) for s in sources]
+    # max-heap via negative keys; ties are broken by the string of the node, as the hidden
+    # START/END nodes are strings while activities may be encoded as integers
+    heap = [(-width[s], str(s), s) for s in sources]
     heapq.heapify(heap)
 
     while heap:
-        neg_w, u = heapq.heappop(heap)
+        neg_w, _, u = heapq.heappop(heap)
         w_u = -neg_w
         if w_u != width.get(u, None):
             continue  # stale heap entry
@@ -138,7 +139,7 @@ def _widest_parents_multi_source(sources, out_adj, edge_weight):
             if cap > width.get(v, -1):
                 width[v] = cap
                 parent[v] = u
-                heapq.heappush(heap, (-cap, v))
+                heapq.heappush(heap, (-cap, str(v), v))
 
     return parent
 
@@ -154,11 +155,11 @@ def _reverse_widest_next_multi_sink(sinks, in_adj, edge_weight):
     width = {t: math.inf for t in sinks}
     next_hop = {t: None for t in sinks}
 
-    heap = [(-width[t], t) for t in sinks]
+    heap = [(-width[t], str(t), t) for t in sinks]
     heapq.heapify(heap)
 
     while heap:
-        neg_w, v = heapq.heappop(heap)
+        neg_w, _, v = heapq.heappop(heap)
         w_v = -neg_w
         if w_v != width.get(v, None):
             continue  # stale
@@ -169,7 +170,7 @@ def _reverse_widest_next_multi_sink(sinks, in_adj, edge_weight):
             if cap > width.get(u, -1):
                 width[u] = cap
                 next_hop[u] = v
-                heapq.heappush(heap, (-cap, u))
+                heapq.heappush(heap, (-cap, str(u), u))
 
     return next_hop
 
@@ -0,0 +1,468 @@
+import gzip
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pm4py.util.compression.dtypes import UVCL
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+COMPLETION_TRANSITIONS = ("complete", "COMPLETE", "Complete")
+XES_CASE_PREFIX = "case:"
+
+# sort key of events without a timestamp, which are ordered last within their case
+MISSING_TIMESTAMP = np.iinfo(np.int64).max
+
+
+class VariantTable:
+    """
+    Variants of the cases read so far. A case is added once all of its events are known and only
+    its variant is kept, with and without the events that are not completion events (the latter
+    are dropped only if the log contains completion events at all, as in ``discover``).
+
+    The case identifiers are not kept: a variant only keeps its frequency and the smallest
+    identifier of its cases (the variants are ordered by it), so the memory is bounded by the
+    variants.
+    """
+
+    def __init__(self, numeric_case_ids: bool = False):
+        """
+        :param numeric_case_ids: sort the case identifiers as numbers if they all are numeric
+        """
+        # conversions of the identifiers into sort keys (None keeps them as they are); a numeric
+        # conversion is dropped at the first identifier it fails on
+        self._conversions = [int, float, None] if numeric_case_ids else [None]
+        self._variant_ids: Dict[Tuple[Any, ...], int] = {}
+        self._variants: List[Tuple[Any, ...]] = []
+        # per variant of all events and of the completion events: the frequency, and for every
+        # conversion the smallest key of the cases, with the number of the first case having it
+        self._frequencies: Tuple[List[int], List[int]] = ([], [])
+        self._first_cases: Tuple[List[Optional[List[Tuple[Any, int]]]], ...] = ([], [])
+        self.num_cases = 0
+        self.has_completion_events = False
+
+    def _variant_id(self, variant: Tuple[Any, ...]) -> int:
+        variant_id = self._variant_ids.get(variant)
+        if variant_id is None:
+            variant_id = len(self._variants)
+            self._variant_ids[variant] = variant_id
+            self._variants.append(variant)
+            for frequencies, first_cases in zip(self._frequencies, self._first_cases):
+                frequencies.append(0)
+                first_cases.append(None)
+        return variant_id
+
+    def _sort_keys(self, case_id: Hashable) -> List[Any]:
+        keys = []
+        for convert in list(self._conversions):
+            try:
+                keys.append(case_id if convert is None else convert(case_id))
+            except (TypeError, ValueError):
+                k = self._conversions.index(convert)
+                del self._conversions[k]
+                for first_cases in self._first_cases:
+                    for first_case in first_cases:
+                        if first_case is not None:
+                            del first_case[k]
+        return keys
+
+    def _count(self, k: int, variant_id: int, keys: List[Any]) -> None:
+        self._frequencies[k][variant_id] += 1
+        first_case = self._first_cases[k][variant_id]
+        if first_case is None:
+            self._first_cases[k][variant_id] = [(key, self.num_cases) for key in keys]
+            return
+        for c, key in enumerate(keys):
+            # on equal keys, the earlier case comes first
+            if key < first_case[c][0]:
+                first_case[c] = (key, self.num_cases)
+
+    def add_case(
+        self, case_id: Hashable, activities: List[Any], completion: List[bool]
+    ) -> None:
+        """
+        :param activities: the activities of the events of the case, in order
+        :param completion: whether each event is a completion event
+        """
+        completed = tuple(a for a, c in zip(activities, completion) if c)
+        self.has_completion_events = self.has_completion_events or len(completed) > 0
+        keys = self._sort_keys(case_id)
+        self._count(0, self._variant_id(tuple(activities)), keys)
+        self._count(1, self._variant_id(completed), keys)
+        self.num_cases += 1
+
+    def to_uvcl(
+        self,
+        keep_only_completion_events: bool = True,
+        decode: Optional[List[Any]] = None,
+    ) -> UVCL:
+        """
+        :param decode: maps the activity codes of the variants to the activities (if any)
+        :return: the variants, in the order of their first case when sorting the cases by their
+            identifier (as when projecting a dataframe on its variants)
+        """
+        completion = keep_only_completion_events and self.has_completion_events
+        k = 1 if completion else 0
+        frequencies = self._frequencies[k]
+        first_cases = self._first_cases[k]
+        uvcl = Counter()
+        # the first remaining conversion orders the cases
+        variant_ids = [v for v, f in enumerate(frequencies) if f > 0]
+        for variant_id in sorted(variant_ids, key=lambda v: first_cases[v][0]):
+            variant = self._variants[variant_id]
+            # cases without completion events have no events left
+            if completion and len(variant) == 0:
+                continue
+            uvcl[variant] = frequencies[variant_id]
+        if decode is not None:
+            uvcl = Counter(
+                {tuple(decode[a] for a in variant): f for variant, f in uvcl.items()}
+            )
+        return uvcl
+
+
+class _SeenCases:
+    """
+    Hashes of the case identifiers read so far, to detect a case that reappears after its events
+    ended (i.e. a file not grouped by case) with 8 bytes per case. The hashes are kept in sorted
+    arrays whose sizes at least halve from one to the next, merged like the digits of a binary
+    counter. A hash collision only makes the file be read as an ungrouped one.
+    """
+
+    def __init__(self):
+        self._levels: List[np.ndarray] = []
+
+    def add(self, case_ids: np.ndarray) -> bool:
+        """
+        :return: whether one of the cases was already read (or occurs twice)
+        """
+        if len(case_ids) == 0:
+            return False
+        hashes = np.sort(pd.util.hash_array(case_ids))
+        if (hashes[1:] == hashes[:-1]).any():
+            return True
+        for level in self._levels:
+            positions = np.searchsorted(level, hashes).clip(max=len(level) - 1)
+            if (level[positions] == hashes).any():
+                return True
+        self._levels.append(hashes)
+        while len(self._levels) > 1 and len(self._levels[-2]) <= 2 * len(
+            self._levels[-1]
+        ):
+            last = self._levels.pop()
+            self._levels[-1] = np.sort(np.concatenate([self._levels[-1], last]))
+        return False
+
+
+def _parse_timestamps(values: pd.Series) -> np.ndarray:
+    try:
+        timestamps = pd.to_datetime(values, utc=True, format="ISO8601")
+    except ValueError:
+        timestamps = pd.to_datetime(
+            values, utc=True, format="mixed", errors="coerce"
+        )
+    ns = timestamps.dt.tz_convert(None).to_numpy().astype("datetime64[ns]")
+    ns = ns.view(np.int64).copy()
+    ns[timestamps.isna().to_numpy()] = MISSING_TIMESTAMP
+    return ns
+
+
+class _CsvChunks:
+    """
+    Reads the case, activity, timestamp and lifecycle columns of a CSV file in chunks of rows, with
+    the activities encoded as integers shared by all the chunks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        activity_key: str,
+        timestamp_key: Optional[str],
+        case_id_key: str,
+        lifecycle_key: Optional[str],
+        chunk_size: int,
+    ):
+        columns = pd.read_csv(path, nrows=0).columns
+        for key in (activity_key, case_id_key):
+            if key not in columns:
+                raise ValueError(f"Column {key} not found in table!")
+        if timestamp_key is not None and timestamp_key not in columns:
+            raise ValueError("Timestamp key not found in table!")
+        self.path = path
+        self.activity_key = activity_key
+        self.timestamp_key = timestamp_key
+        self.case_id_key = case_id_key
+        self.lifecycle_key = lifecycle_key if lifecycle_key in columns else None
+        self.chunk_size = chunk_size
+        self.activities: List[Any] = []
+        self._activity_codes: Dict[Any, int] = {}
+
+    def _encode(self, activities: pd.Series) -> np.ndarray:
+        codes, labels = pd.factorize(activities)
+        mapping = np.empty(len(labels), dtype=np.int64)
+        for i, label in enumerate(labels):
+            code = self._activity_codes.get(label)
+            if code is None:
+                code = len(self.activities)
+                self._activity_codes[label] = code
+                self.activities.append(label)
+            mapping[i] = code
+        return mapping[codes]
+
+    def __iter__(
+        self,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        :return: per chunk, the case identifiers, activity codes, timestamps (as nanoseconds) and
+            completion flags of its events
+        """
+        keys = [
+            k
+            for k in (
+                self.case_id_key,
+                self.activity_key,
+                self.timestamp_key,
+                self.lifecycle_key,
+            )
+            if k is not None
+        ]
+        reader = pd.read_csv(
+            self.path,
+            usecols=keys,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=self.chunk_size,
+        )
+        for chunk in reader:
+            cases = chunk[self.case_id_key].to_numpy(dtype=object)
+            activities = self._encode(chunk[self.activity_key])
+            if self.timestamp_key is not None:
+                timestamps = _parse_timestamps(chunk[self.timestamp_key])
+            else:
+                timestamps = np.zeros(len(chunk), dtype=np.int64)
+            if self.lifecycle_key is not None:
+                completion = chunk[self.lifecycle_key].isin(COMPLETION_TRANSITIONS)
+                completion = completion.to_numpy()
+            else:
+                completion = np.zeros(len(chunk), dtype=bool)
+            yield cases, activities, timestamps, completion
+
+
+def _add_runs(
+    table: VariantTable,
+    cases: np.ndarray,
+    activities: np.ndarray,
+    timestamps: np.ndarray,
+    completion: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+) -> None:
+    # adds the cases of runs of events, each run holding all the events of a case
+    for s, e in zip(starts.tolist(), ends.tolist()):
+        order = np.argsort(timestamps[s:e], kind="stable") + s
+        table.add_case(
+            cases[s], activities[order].tolist(), completion[order].tolist()
+        )
+
+
+def _runs(cases: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if len(cases) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, cases[1:] != cases[:-1]])
+    return starts, np.r_[starts[1:], len(cases)]
+
+
+def _read_grouped_csv(chunks: _CsvChunks) -> Optional[VariantTable]:
+    """
+    Reads a CSV file whose events are grouped by case, keeping only the events of the last case
+    of a chunk (which may continue in the next one) besides the variants and the hashes of the
+    case identifiers.
+
+    :return: the variants, or None as soon as a case reappears after its events ended
+    """
+    table = VariantTable(numeric_case_ids=True)
+    seen = _SeenCases()
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = tuple(np.concatenate([c, n]) for c, n in zip(carry, chunk))
+        starts, ends = _runs(chunk[0])
+        if len(starts) == 0:
+            continue
+        if seen.add(chunk[0][starts[:-1]]):
+            return None
+        _add_runs(table, *chunk, starts[:-1], ends[:-1])
+        carry = tuple(c[starts[-1] :] for c in chunk)
+    if carry is not None:
+        starts, ends = _runs(carry[0])
+        if seen.add(carry[0][starts]):
+            return None
+        _add_runs(table, *carry, starts, ends)
+    return table
+
+
+def _read_ungrouped_csv(chunks: _CsvChunks) -> VariantTable:
+    """
+    Reads a CSV file whose events are not grouped by case, keeping the (encoded) events of all the
+    cases until the end of the file.
+    """
+    case_codes: Dict[Hashable, int] = {}
+    case_ids: List[Hashable] = []
+    parts = []
+    for cases, activities, timestamps, completion in chunks:
+        codes, labels = pd.factorize(cases)
+        mapping = np.empty(len(labels), dtype=np.int64)
+        for i, case_id in enumerate(labels):
+            code = case_codes.get(case_id)
+            if code is None:
+                code = len(case_ids)
+                case_codes[case_id] = code
+                case_ids.append(case_id)
+            mapping[i] = code
+        parts.append((mapping[codes], activities, timestamps, completion))
+    del case_codes
+
+    table = VariantTable(numeric_case_ids=True)
+    if not parts:
+        return table
+    cases, activities, timestamps, completion = (np.concatenate(p) for p in zip(*parts))
+    del parts
+    # the identifiers are added in the order of the cases, so the table orders them itself
+    order = np.lexsort((timestamps, cases))
+    cases, activities, timestamps, completion = (
+        cases[order],
+        activities[order],
+        timestamps[order],
+        completion[order],
+    )
+    starts, ends = _runs(cases)
+    for s, e in zip(starts.tolist(), ends.tolist()):
+        table.add_case(
+            case_ids[cases[s]],
+            activities[s:e].tolist(),
+            completion[s:e].tolist(),
+        )
+    return table
+
+
+def read_csv_variants(
+    path: str,
+    activity_key: str = "concept:name",
+    timestamp_key: Optional[str] = "time:timestamp",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: Optional[str] = "lifecycle:transition",
+    keep_only_completion_events: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> UVCL:
+    """
+    Reads the variants of a CSV event log without loading it: only the case, activity, timestamp
+    and lifecycle columns are read, in chunks of rows. If the events are grouped by case (e.g. an
+    export sorted by case), the memory is bounded by a chunk, the variants and a 64-bit hash per
+    case; otherwise the file is read a second time as soon as a case reappears, keeping the encoded
+    events and the identifiers of all cases.
+
+    The events of a case are ordered by their timestamp (events with equal timestamps keep the
+    order of the file) and the variants are ordered as in ``discover``. All values are read as
+    strings, so numeric activities become string labels.
+
+    :param timestamp_key: None if the events are already ordered within their case
+    :param lifecycle_key: column of the lifecycle transitions, ignored if not in the file
+    :param keep_only_completion_events: drop the events that are not completion events, if any
+    :param chunk_size: number of rows read at once
+    """
+    chunks = _CsvChunks(
+        path, activity_key, timestamp_key, case_id_key, lifecycle_key, chunk_size
+    )
+    table = _read_grouped_csv(chunks)
+    if table is None:
+        table = _read_ungrouped_csv(chunks)
+    return table.to_uvcl(keep_only_completion_events, decode=chunks.activities)
+
+
+def _xes_timestamp(value: Optional[str]) -> float:
+    if value is None:
+        return float("inf")
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def read_xes_variants(
+    path: str,
+    activity_key: str = "concept:name",
+    timestamp_key: Optional[str] = "time:timestamp",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: Optional[str] = "lifecycle:transition",
+    keep_only_completion_events: bool = True,
+) -> UVCL:
+    """
+    Reads the variants of a XES event log (optionally gzipped) trace by trace, so that only the
+    events of the current trace and the variants are kept in memory.
+
+    :param case_id_key: attribute of the case identifiers (a trace attribute, ``case:`` prefixed)
+    """
+    from lxml import etree
+
+    case_attribute = case_id_key
+    if case_attribute.startswith(XES_CASE_PREFIX):
+        case_attribute = case_attribute[len(XES_CASE_PREFIX) :]
+    opener = gzip.open if path.endswith(".gz") else open
+
+    table = VariantTable()
+    with opener(path, "rb") as file:
+        for _, trace in etree.iterparse(file, events=("end",), tag="{*}trace"):
+            case_id = None
+            events = []
+            for element in trace:
+                if not isinstance(element.tag, str):
+                    continue
+                tag = etree.QName(element).localname
+                if tag == "event":
+                    attributes = {
+                        child.get("key"): child.get("value")
+                        for child in element
+                        if isinstance(child.tag, str)
+                    }
+                    events.append(
+                        (
+                            _xes_timestamp(attributes.get(timestamp_key)),
+                            attributes.get(activity_key),
+                            attributes.get(lifecycle_key) in COMPLETION_TRANSITIONS,
+                        )
+                    )
+                elif element.get("key") == case_attribute:
+                    case_id = element.get("value")
+            events.sort(key=lambda event: event[0])
+            table.add_case(
+                case_id if case_id is not None else str(table.num_cases),
+                [event[1] for event in events],
+                [event[2] for event in events],
+            )
+            # the parsed traces are released, bounding the memory by a single trace
+            trace.clear()
+            while trace.getprevious() is not None:
+                del trace.getparent()[0]
+    return table.to_uvcl(keep_only_completion_events)
+
+
+def read_variants(path: str, bounded_memory: bool = False, **kwargs) -> UVCL:
+    """
+    Reads the variants of a CSV or XES event log (see read_csv_variants, read_xes_variants and
+    xes_import.read_rustxes_variants).
+
+    :param bounded_memory: stream XES files trace by trace instead of importing them with rustxes
+        (slower, but the log is never held in memory)
+    """
+    if path.endswith(".xes") or path.endswith(".xes.gz"):
+        kwargs.pop("chunk_size", None)
+        if bounded_memory:
+            return read_xes_variants(path, **kwargs)
+        from powl.general_utils.xes_import import read_rustxes_variants
+
+        return read_rustxes_variants(path, **kwargs)
+    elif path.endswith(".csv"):
+        return read_csv_variants(path, **kwargs)
+    else:
+        raise ValueError("Unsupported file type!")
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+from typing import Any, Callable, Dict
+
+import numpy as np
+from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
+from pm4py.objects.dfg.obj import DFG
+from pm4py.util.compression.dtypes import UVCL
+
+from powl.discovery.total_order_based.inductive.utils.eventually_follows import (
+    EFG_ATTRIBUTE,
+    get_efg,
+)
+
+# bumped whenever the layout of the cached variant logs changes
+CACHE_FORMAT_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 24
+# content hashes of the files already hashed, by path, size and modification time
+FILE_INDEX = "files.json"
+LABELS = "activities.json"
+ARRAYS = (
+    "events",
+    "offsets",
+    "frequencies",
+    "dfg_graph",
+    "dfg_start_activities",
+    "dfg_end_activities",
+    "efg",
+)
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hash(path: str, cache_dir: str) -> str:
+    """
+    :return: the hash of the content of the file; it is only recomputed if the size or the
+        modification time of the file changed since it was last hashed
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    index_path = os.path.join(cache_dir, FILE_INDEX)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as file:
+            index = json.load(file)
+    entry = index.get(key)
+    if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return entry[2]
+    digest = _hash_file(path)
+    index[key] = [stat.st_size, stat.st_mtime_ns, digest]
+    fd, tmp = tempfile.mkstemp(dir=cache_dir)
+    with os.fdopen(fd, "w") as file:
+        json.dump(index, file)
+    os.replace(tmp, index_path)
+    return digest
+
+
+def cache_key(digest: str, mapping: Dict[str, Any]) -> str:
+    """
+    :param digest: the content hash of the event log
+    :param mapping: the columns and options the variants were read with
+    """
+    key = json.dumps(
+        [CACHE_FORMAT_VERSION, digest, mapping], sort_keys=True, default=str
+    )
+    return hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+
+
+def save_variant_log(directory: str, obj: IMDataStructureUVCL) -> None:
+    """
+    Stores a log, its DFG and its eventually-follows graph as NumPy arrays over activity codes
+    (the activities are stored as JSON). The directory is replaced atomically.
+    """
+    uvcl = obj.data_structure
+    labels = []
+    codes = {}
+    for variant in uvcl:
+        for activity in variant:
+            if activity not in codes:
+                codes[activity] = len(labels)
+                labels.append(activity)
+    lengths = [len(variant) for variant in uvcl]
+    dfg = obj.dfg
+    arrays = {
+        "events": np.fromiter(
+            (codes[a] for variant in uvcl for a in variant),
+            dtype=np.int32,
+            count=sum(lengths),
+        ),
+        "offsets": np.cumsum([0] + lengths, dtype=np.int64),
+        "frequencies": np.array(list(uvcl.values()), dtype=np.int64),
+        # the order of the DFG is kept, as the cuts depend on it
+        "dfg_graph": np.array(
+            [(codes[a], codes[b], f) for (a, b), f in dfg.graph.items()],
+            dtype=np.int64,
+        ).reshape(-1, 3),
+        "dfg_start_activities": np.array(
+            [(codes[a], f) for a, f in dfg.start_activities.items()], dtype=np.int64
+        ).reshape(-1, 2),
+        "dfg_end_activities": np.array(
+            [(codes[a], f) for a, f in dfg.end_activities.items()], dtype=np.int64
+        ).reshape(-1, 2),
+        "efg": np.array(
+            [(codes[a], codes[b], f) for (a, b), f in get_efg(obj).items()],
+            dtype=np.int64,
+        ).reshape(-1, 3),
+    }
+
+    parent = os.path.dirname(os.path.abspath(directory))
+    tmp = tempfile.mkdtemp(dir=parent)
+    try:
+        with open(os.path.join(tmp, LABELS), "w") as file:
+            json.dump(labels, file)
+        for name in ARRAYS:
+            np.save(os.path.join(tmp, name + ".npy"), arrays[name])
+        os.replace(tmp, directory)
+    except OSError:
+        # another process stored the same log in the meantime
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(directory):
+            raise
+
+
+def load_variant_log(directory: str) -> IMDataStructureUVCL:
+    """
+    :return: the log stored in the directory (see save_variant_log), with its DFG and
+        eventually-follows graph
+    """
+    with open(os.path.join(directory, LABELS)) as file:
+        labels = json.load(file)
+    arrays = {
+        name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+        for name in ARRAYS
+    }
+    values = np.array(labels + [None], dtype=object)[:-1][arrays["events"]].tolist()
+    offsets = arrays["offsets"].tolist()
+    uvcl = Counter()
+    for start, end, freq in zip(
+        offsets[:-1], offsets[1:], arrays["frequencies"].tolist()
+    ):
+        uvcl[tuple(values[start:end])] = freq
+
+    dfg = DFG()
+    for a, b, f in arrays["dfg_graph"].tolist():
+        dfg.graph[(labels[a], labels[b])] = f
+    for a, f in arrays["dfg_start_activities"].tolist():
+        dfg.start_activities[labels[a]] = f
+    for a, f in arrays["dfg_end_activities"].tolist():
+        dfg.end_activities[labels[a]] = f
+    obj = IMDataStructureUVCL(uvcl, dfg)
+    efg = {(labels[a], labels[b]): f for a, b, f in arrays["efg"].tolist()}
+    setattr(obj, EFG_ATTRIBUTE, efg)
+    return obj
+
+
+def cached_variant_log(
+    path: str, cache_dir: str, mapping: Dict[str, Any], read: Callable[[], UVCL]
+) -> IMDataStructureUVCL:
+    """
+    Variants of an event log, read from the cache directory if the same file was already read
+    with the same mapping, and otherwise read and stored there with their DFG and
+    eventually-follows graph.
+
+    :param mapping: the columns and options the variants are read with (part of the key)
+    :param read: reads the variants of the event log
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    directory = os.path.join(
+        cache_dir, cache_key(content_hash(path, cache_dir), mapping)
+    )
+    if os.path.isdir(directory):
+        return load_variant_log(directory)
+    obj = IMDataStructureUVCL(read())
+    save_variant_log(directory, obj)
+    return obj
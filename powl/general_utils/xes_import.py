@@ -0,0 +1,63 @@
+from collections import Counter
+from typing import List, Optional
+
+from pm4py.util.compression.dtypes import UVCL
+
+from powl.general_utils.streaming_import import COMPLETION_TRANSITIONS
+
+
+def _select(frame, columns: List[str]):
+    missing = [c for c in columns if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in table!")
+    return frame.select(columns)
+
+
+def import_xes_frame(path: str, columns: Optional[List[str]] = None):
+    """
+    Imports a XES event log with rustxes as a Polars dataframe, keeping only the given columns
+    (the other attributes are dropped before any conversion).
+
+    :param columns: the columns to keep (all by default)
+    """
+    import rustxes
+
+    [xes, log_attrs] = rustxes.import_xes(path)
+    return xes if columns is None else _select(xes, columns)
+
+
+def read_rustxes_variants(
+    path: str,
+    activity_key: str = "concept:name",
+    timestamp_key: Optional[str] = "time:timestamp",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: Optional[str] = "lifecycle:transition",
+    keep_only_completion_events: bool = True,
+) -> UVCL:
+    """
+    Reads the variants of a XES event log from the Polars dataframe of rustxes: only the case,
+    activity, timestamp and lifecycle columns are kept, and the events are grouped into traces and
+    the traces into variants by Polars. The variants are the ones of the dataframe of the log (in
+    the same order), without converting it to pandas.
+    """
+    import polars as pl
+
+    frame = import_xes_frame(path)
+    columns = [c for c in (case_id_key, activity_key, timestamp_key) if c is not None]
+    if lifecycle_key in frame.columns:
+        columns.append(lifecycle_key)
+    frame = _select(frame, columns)
+    if keep_only_completion_events and lifecycle_key in frame.columns:
+        completion = frame[lifecycle_key].is_in(list(COMPLETION_TRANSITIONS))
+        if completion.any():
+            frame = frame.filter(completion)
+
+    # cases ordered by identifier and events by timestamp (stable, missing timestamps last), as
+    # when sorting the pandas dataframe
+    by = [case_id_key] if timestamp_key is None else [case_id_key, timestamp_key]
+    frame = frame.sort(by, maintain_order=True, nulls_last=True)
+    traces = frame.group_by(case_id_key, maintain_order=True).agg(pl.col(activity_key))
+    variants = traces.group_by(activity_key, maintain_order=True).len()
+    return Counter(
+        {tuple(variant): freq for variant, freq in variants.iter_rows()}
+    )
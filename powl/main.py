@@ -1,11 +1,14 @@
 import warnings
+from typing import List
 
 import pandas as pd
 import pm4py
+from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
 from pm4py.algo.discovery.inductive.variants.imf import IMFParameters
 from pm4py.objects.bpmn.layout import layouter as bpmn_layouter
 from pm4py.objects.dfg.obj import DFG
 from pm4py.objects.ocel.obj import OCEL
+from pm4py.util.compression.dtypes import UVCL
 from pm4py.utils import get_properties
 
 from powl.conversion.converter import apply as powl_converter
@@ -13,15 +16,29 @@ from powl.conversion.to_powl.from_pn.converter import convert_workflow_net_to_po
 from powl.conversion.variants.to_bpmn import apply as to_bpmn
 from powl.discovery.dfg_based.algorithm import apply as dfg_discovery
 from powl.discovery.object_centric.algorithm import apply as oc_discovery
+from powl.discovery.total_order_based.inductive.utils.budget import DiscoveryBudget
+from powl.discovery.total_order_based.inductive.utils.executor import (
+    DiscoveryExecutor,
+)
 from powl.discovery.total_order_based.inductive.utils.filtering import (
     FILTERING_THRESHOLD,
 )
 from powl.discovery.total_order_based.inductive.variants.dynamic_clustering_frequency.dynamic_clustering_frequency_partial_order_cut import (
     ORDER_FREQUENCY_RATIO,
 )
+from powl.discovery.total_order_based.inductive.variants.im_tree import (
+    Parameters as IMParameters,
+)
 from powl.discovery.total_order_based.inductive.variants.powl_discovery_varaints import (
     POWLDiscoveryVariant,
 )
+from powl.general_utils.columnar_import import (
+    is_columnar_file,
+    read_columnar_event_log,
+)
+from powl.general_utils.streaming_import import DEFAULT_CHUNK_SIZE, read_variants
+from powl.general_utils.variant_cache import cached_variant_log
+from powl.general_utils.xes_import import import_xes_frame
 from powl.objects.obj import POWL
 from powl.visualization.powl.visualizer import POWLVisualizationVariants
 from pm4py import PetriNet
@@ -35,12 +52,39 @@ def import_ocel(path: str) -> OCEL:
     return ocel
 
 
-def import_event_log(path: str, timestamp_key=None) -> pd.DataFrame:
-    import rustxes
-
-    if path.endswith(".xes") or path.endswith(".xes.gz"):
-        [xes, log_attrs] = rustxes.import_xes(path)
-        df = xes.to_pandas()
+def import_event_log(
+    path: str,
+    timestamp_key=None,
+    columns: List[str] | None = None,
+    activity_key: str = "concept:name",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: str | None = "lifecycle:transition",
+) -> pd.DataFrame:
+    """
+    Imports an event log (.csv, .xes, .xes.gz, .parquet or Arrow IPC .arrow/.feather) into a
+    dataframe. Parquet and Arrow files are memory-mapped and, by default, only the case identifier,
+    activity, timestamp and lifecycle columns are read, with categorical activities.
+
+    :param path: path of the event log
+    :param timestamp_key: column of the timestamps, which are parsed
+    :param columns: columns to read (all by default, only the discovery columns for Parquet and
+        Arrow files)
+    :param activity_key: attribute of the activities (Parquet and Arrow files)
+    :param case_id_key: attribute of the case identifiers (Parquet and Arrow files)
+    :param lifecycle_key: attribute of the lifecycle transitions (Parquet and Arrow files)
+    """
+    if is_columnar_file(path):
+        df = read_columnar_event_log(
+            path,
+            columns=columns,
+            activity_key=activity_key,
+            timestamp_key=timestamp_key if timestamp_key else "time:timestamp",
+            case_id_key=case_id_key,
+            lifecycle_key=lifecycle_key,
+        )
+    elif path.endswith(".xes") or path.endswith(".xes.gz"):
+        # the columns are selected before the conversion to pandas
+        df = import_xes_frame(path, columns).to_pandas()
     elif path.endswith(".csv"):
         cols_to_parse = []
         df_sample = pd.read_csv(path, nrows=0)
@@ -58,17 +102,102 @@ def import_event_log(path: str, timestamp_key=None) -> pd.DataFrame:
                 "No column given as a timestamp key! Timestamp column parsing is skipped!"
             )
 
-        if timestamp_key:
+        if timestamp_key and (columns is None or timestamp_key in columns):
             cols_to_parse = [timestamp_key]
 
-        df = pd.read_csv(path, keep_default_na=False, parse_dates=cols_to_parse)
+        df = pd.read_csv(
+            path, keep_default_na=False, parse_dates=cols_to_parse, usecols=columns
+        )
     else:
         raise ValueError("Unsupported file type!")
     return df
 
 
+def _import_variant_data_structure(
+    path: str,
+    activity_key: str,
+    timestamp_key: str,
+    case_id_key: str,
+    lifecycle_key: str,
+    keep_only_completion_events: bool,
+    chunk_size: int,
+    cache_dir: str | None,
+    bounded_memory: bool = False,
+) -> IMDataStructureUVCL:
+    mapping = {
+        "activity_key": activity_key,
+        "timestamp_key": timestamp_key,
+        "case_id_key": case_id_key,
+        "lifecycle_key": lifecycle_key,
+        "keep_only_completion_events": keep_only_completion_events,
+    }
+
+    def read() -> UVCL:
+        return read_variants(
+            path, bounded_memory=bounded_memory, chunk_size=chunk_size, **mapping
+        )
+
+    if cache_dir is None:
+        return IMDataStructureUVCL(read())
+    return cached_variant_log(path, cache_dir, mapping, read)
+
+
+def import_variant_log(
+    path: str,
+    activity_key: str = "concept:name",
+    timestamp_key: str = "time:timestamp",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: str = "lifecycle:transition",
+    keep_only_completion_events: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache_dir: str | None = None,
+    bounded_memory: bool = False,
+) -> UVCL:
+    """
+    Imports the variants of a CSV or XES event log without loading the log into a pandas
+    dataframe: CSV files are streamed in chunks of rows, and only the case, activity, timestamp and
+    lifecycle columns of the rustxes import of XES files are grouped into variants (or XES files
+    are streamed trace by trace, with ``bounded_memory``). The result can be passed to ``discover``
+    in place of the dataframe.
+
+    :param path: path of the event log (.csv, .xes or .xes.gz)
+    :param activity_key: attribute to be used for the activity
+    :param timestamp_key: attribute to be used for ordering the events of a case
+    :param case_id_key: attribute to be used as case identifier
+    :param lifecycle_key: attribute of the lifecycle transitions
+    :param keep_only_completion_events: keep only the completion events (if the log has any)
+    :param chunk_size: number of CSV rows read at once
+    :param cache_dir: directory caching the variants by the content of the file and the columns
+        (see ``variant_cache``), so that the file is only read once
+    :param bounded_memory: stream XES files instead of importing them at once (slower)
+    :rtype: ``UVCL``
+    """
+    if cache_dir is None:
+        return read_variants(
+            path,
+            bounded_memory=bounded_memory,
+            activity_key=activity_key,
+            timestamp_key=timestamp_key,
+            case_id_key=case_id_key,
+            lifecycle_key=lifecycle_key,
+            keep_only_completion_events=keep_only_completion_events,
+            chunk_size=chunk_size,
+        )
+    return _import_variant_data_structure(
+        path,
+        activity_key,
+        timestamp_key,
+        case_id_key,
+        lifecycle_key,
+        keep_only_completion_events,
+        chunk_size,
+        cache_dir,
+        bounded_memory,
+    ).data_structure
+
+
 def discover(
-    log: pd.DataFrame,
+    log: pd.DataFrame | UVCL | str,
     variant=POWLDiscoveryVariant.DECISION_GRAPH_CYCLIC,
     filtering_weight_factor: float = None,
     order_graph_filtering_threshold: float = None,
@@ -79,6 +208,10 @@ def discover(
     lifecycle_key: str = "lifecycle:transition",
     keep_only_completion_events: bool = True,
     simplify=True,
+    executor: DiscoveryExecutor = None,
+    encode_activities: bool = False,
+    budget: DiscoveryBudget = None,
+    cache_dir: str | None = None,
 ) -> POWL:
     """
     Discovers a POWL model from an event log.
@@ -88,7 +221,8 @@ def discover(
 
     :param keep_only_completion_events:
     :param lifecycle_key:
-    :param log: event log / Pandas dataframe
+    :param log: event log / Pandas dataframe, its variants (see ``import_variant_log``) or the
+        path of a CSV or XES event log, whose variants are streamed
     :param variant: variant of the algorithm
     :param filtering_weight_factor: accepts values 0 <= x < 1
     :param order_graph_filtering_threshold: accepts values 0.5 < x <= 1
@@ -97,20 +231,45 @@ def discover(
     :param timestamp_key: attribute to be used for the timestamp
     :param case_id_key: attribute to be used as case identifier
     :param simplify: whether to simplify or not the POWL model
+    :param executor: worker pools shared across discovery calls (see ``DiscoveryExecutor``)
+    :param encode_activities: mine on integer-encoded activities (faster on large alphabets)
+    :param budget: time/step budget of the discovery; the sub-models approximated once it is
+        exhausted are reported in ``budget.approximated`` (see ``DiscoveryBudget``)
+    :param cache_dir: directory caching the variants of an event log given by its path, with their
+        DFG and eventually-follows graph, across runs (see ``import_variant_log``)
     :rtype: ``POWL``
     """
 
-    log = log.sort_values([case_id_key, timestamp_key])
-    properties = get_properties(
-        log, activity_key=activity_key, timestamp_key=timestamp_key
-    )
+    if isinstance(log, pd.DataFrame):
+        properties = get_properties(
+            log,
+            activity_key=activity_key,
+            timestamp_key=timestamp_key,
+            case_id_key=case_id_key,
+        )
 
-    if keep_only_completion_events and lifecycle_key in log.columns:
-        filtered_log = log[
-            log["lifecycle:transition"].isin(["complete", "COMPLETE", "Complete"])
-        ]
-        if len(filtered_log) > 0:
-            log = filtered_log
+        # the variants are built from the activities of the cases ordered by timestamp (the log is
+        # not sorted here), so only these columns are kept when filtering the log
+        columns = [case_id_key, activity_key, timestamp_key]
+        if keep_only_completion_events and lifecycle_key in log.columns:
+            completion = log[lifecycle_key].isin(["complete", "COMPLETE", "Complete"])
+            if completion.any():
+                log = log.loc[completion.to_numpy(), columns]
+    elif isinstance(log, str):
+        log = _import_variant_data_structure(
+            log,
+            activity_key,
+            timestamp_key,
+            case_id_key,
+            lifecycle_key,
+            keep_only_completion_events,
+            DEFAULT_CHUNK_SIZE,
+            cache_dir,
+        )
+        properties = {}
+    else:
+        # the variants are already projected on the (completion) events
+        properties = {}
 
     from powl.discovery.total_order_based.inductive.utils.filtering import (
         FILTERING_TYPE,
@@ -140,10 +299,19 @@ def discover(
             "The algorithm can only be used with one filtering threshold at a time!"
         )
 
+    if encode_activities:
+        properties[IMParameters.ENCODE_ACTIVITIES] = True
+    if budget is not None:
+        properties[IMParameters.BUDGET] = budget
+
     from powl.discovery.total_order_based import algorithm as powl_discovery
 
     return powl_discovery.apply(
-        log, variant=variant, parameters=properties, simplify=simplify
+        log,
+        variant=variant,
+        parameters=properties,
+        simplify=simplify,
+        executor=executor,
     )
 
 
@@ -151,8 +319,12 @@ def discover_petri_net_from_ocel(ocel: OCEL, parameters=None):
     return oc_discovery(ocel, parameters=parameters)
 
 
-def discover_from_dfg(dfg: DFG, variant=POWLDiscoveryVariant.MAXIMAL, parameters=None):
-    return dfg_discovery(dfg, variant=variant, parameters=parameters)
+def discover_from_dfg(
+    dfg: DFG, variant=POWLDiscoveryVariant.MAXIMAL, parameters=None, executor=None
+):
+    return dfg_discovery(
+        dfg, variant=variant, parameters=parameters, executor=executor
+    )
 
 
 def discover_from_partially_ordered_log(
@@ -1,21 +1,77 @@
-import copy
-from itertools import product
-from typing import Hashable, List as TList, Set as TSet, TypeVar
+from typing import Hashable, List as TList, Optional, Set as TSet, Tuple, TypeVar
+
+from powl.objects.utils.relation_backends import get_storage, RelationBackend
 
 T = TypeVar("T", bound=Hashable)
 
 
 class BinaryRelation:
-    def __init__(self, nodes: TList[T]):
+    default_backend: RelationBackend = RelationBackend.NUMPY
+
+    def __init__(
+        self,
+        nodes: TList[T],
+        backend: Optional[RelationBackend] = None,
+        maintain_closure: bool = False,
+    ):
+        """
+        :param nodes: the nodes of the relation
+        :param backend: storage engine of the adjacency matrix (defaults to ``default_backend``)
+        :param maintain_closure: keep the transitive closure up to date on every edge mutation, so
+            that reachability, transitivity and strict-partial-order queries avoid a full rescan
+        """
+        if backend is None:
+            backend = BinaryRelation.default_backend
+        self._backend = backend
+        self._storage = get_storage(backend)
         self._number_nodes = 0
+        self._maintain_closure = maintain_closure
+        self._closure = None
         self._set_nodes(nodes)
-        self._edges = [
-            [False for _ in range(self._number_nodes)]
-            for _ in range(self._number_nodes)
-        ]
+        self._edges = self._storage.empty(self._number_nodes)
+        if maintain_closure:
+            self._closure = self._storage.empty(self._number_nodes)
+        self._predecessors = [set() for _ in range(self._number_nodes)]
+        self._successors = [set() for _ in range(self._number_nodes)]
+
+    @property
+    def backend(self) -> RelationBackend:
+        return self._backend
+
+    @property
+    def maintains_closure(self) -> bool:
+        return self._maintain_closure
+
+    def _matrix(self):
+        return self._storage.view(self._edges, self._number_nodes)
+
+    def _get_closure(self):
+        if self._closure is None:
+            closure = self._storage.transitive_closure(
+                self._matrix(), self._number_nodes
+            )
+            if not self._maintain_closure:
+                return closure
+            self._closure = closure
+        return self._storage.view(self._closure, self._number_nodes)
+
+    def _invalidate_indexes(self) -> None:
+        # the adjacency indexes are rebuilt lazily from the matrix on the next query
+        self._predecessors = None
+        self._successors = None
         self._start_nodes = None
         self._end_nodes = None
 
+    def _get_indexes(self):
+        if self._successors is None:
+            n = self._number_nodes
+            self._predecessors = [set() for _ in range(n)]
+            self._successors = [set() for _ in range(n)]
+            for i, j in self._storage.edge_ids(self._matrix(), n):
+                self._successors[i].add(j)
+                self._predecessors[j].add(i)
+        return self._predecessors, self._successors
+
     def get_nodes(self) -> TList[T]:
         return self._nodes
 
@@ -29,6 +85,8 @@ class BinaryRelation:
             self._map_id_to_node[n] = node
             n = n + 1
         self._number_nodes = n
+        self._closure = None
+        self._invalidate_indexes()
 
     def add_edge(self, source: T, target: T) -> None:
         try:
@@ -37,7 +95,22 @@ class BinaryRelation:
         except Exception:
             raise Exception("Unable to create edge! Invalid  source or target!")
         else:
-            self._edges[i][j] = True
+            self.add_edge_id(i, j)
+
+    def add_edge_id(self, i: int, j: int) -> None:
+        self._edges[i][j] = True
+        if self._closure is not None:
+            self._storage.add_to_closure(
+                self._storage.view(self._closure, self._number_nodes),
+                self._number_nodes,
+                i,
+                j,
+            )
+        if self._successors is not None:
+            self._successors[i].add(j)
+            self._predecessors[j].add(i)
+        self._start_nodes = None
+        self._end_nodes = None
 
     def remove_edge(self, source: T, target: T) -> None:
         try:
@@ -46,7 +119,24 @@ class BinaryRelation:
         except Exception:
             raise Exception("Unable to remove edge! Invalid  source or target!")
         else:
-            self._edges[i][j] = False
+            self.remove_edge_id(i, j)
+
+    def remove_edge_id(self, i: int, j: int) -> None:
+        self._edges[i][j] = False
+        if self._closure is not None and not self._storage.closure_survives_removal(
+            self._matrix(),
+            self._storage.view(self._closure, self._number_nodes),
+            self._number_nodes,
+            i,
+            j,
+        ):
+            # the closure is recomputed lazily on the next query
+            self._closure = None
+        if self._successors is not None:
+            self._successors[i].discard(j)
+            self._predecessors[j].discard(i)
+        self._start_nodes = None
+        self._end_nodes = None
 
     def remove_edge_without_violating_transitivity(self, source: T, target: T) -> None:
         try:
@@ -56,34 +146,27 @@ class BinaryRelation:
             raise Exception("Unable to remove edge! Invalid  source or target!")
         else:
             self._edges[i][j] = False
-            n = len(self.nodes)
-            changed = True
-            while changed:
-                changed = False
-                for i, j, k in product(range(n), range(n), range(n)):
-                    if (
-                        i != j
-                        and j != k
-                        and self._edges[i][j]
-                        and self._edges[j][k]
-                        and not self._edges[i][k]
-                    ):
-                        self._edges[j][k] = False
-                        changed = True
+            self._storage.remove_transitivity_violations(
+                self._matrix(), self._number_nodes
+            )
+            self._closure = None
+            self._invalidate_indexes()
 
     def add_node(self, node: T) -> None:
-        if node not in self._nodes:
+        if node not in self._map_node_to_id:
             self._nodes.append(node)
             n = self._number_nodes
             self._map_node_to_id[node] = n
             self._map_id_to_node[n] = node
-            new_edges = [[False for _ in range(n + 1)] for _ in range(n + 1)]
-            for i in range(n):
-                for j in range(n):
-                    new_edges[i][j] = self._edges[i][j]
-
-            self._edges = new_edges
+            self._edges = self._storage.grow(self._edges, n, n + 1)
+            if self._closure is not None:
+                self._closure = self._storage.grow(self._closure, n, n + 1)
+            if self._successors is not None:
+                self._predecessors.append(set())
+                self._successors.append(set())
             self._number_nodes = n + 1
+            self._start_nodes = None
+            self._end_nodes = None
 
     def is_edge(self, source, target) -> bool:
         try:
@@ -95,10 +178,21 @@ class BinaryRelation:
             print(self._nodes)
             raise Exception("Unable to create edge! Invalid  source or target!")
         else:
-            return self._edges[i][j]
+            return bool(self._edges[i][j])
 
     def is_edge_id(self, i: int, j: int) -> bool:
-        return self._edges[i][j]
+        return bool(self._edges[i][j])
+
+    def is_reachable(self, source: T, target: T) -> bool:
+        i = self._map_node_to_id[source]
+        j = self._map_node_to_id[target]
+        return bool(self._get_closure()[i][j])
+
+    def _copy_with_edges(self, edges) -> "BinaryRelation":
+        res = BinaryRelation(self.nodes, backend=self._backend)
+        res._edges = edges
+        res._invalidate_indexes()
+        return res
 
     def get_transitive_reduction(self) -> "BinaryRelation":
         if not self.is_irreflexive():
@@ -106,75 +200,55 @@ class BinaryRelation:
                 "Cannot generate transitive reduction! Reflexivity detected!"
             )
 
-        tc = BinaryRelation(self.nodes)
-        tc._edges = copy.deepcopy(self._edges)
-        tc.add_transitive_edges()
-
-        tr = BinaryRelation(self.nodes)
-        tr._edges = copy.deepcopy(self._edges)
-
-        n = len(self.nodes)
-        for i, j, k in product(range(n), range(n), range(n)):
-            if (
-                i != j
-                and j != k
-                and tc.edges[i][j]
-                and tc.edges[j][k]
-                and tc.edges[i][k]
-            ):
-                tr._edges[i][k] = False
-        return tr
+        return self._copy_with_edges(
+            self._storage.transitive_reduction(self._matrix(), self._number_nodes)
+        )
 
     def add_transitive_edges(self) -> None:
-        n = len(self.nodes)
-        changed = True
-        while changed:
-            changed = False
-            for i, j, k in product(range(n), range(n), range(n)):
-                if (
-                    i != j
-                    and j != k
-                    and self._edges[i][j]
-                    and self._edges[j][k]
-                    and not self.is_edge_id(i, k)
-                ):
-                    self._edges[i][k] = True
-                    changed = True
+        if self._maintain_closure:
+            self._edges = self._storage.copy(self._get_closure())
+        else:
+            self._storage.add_transitive_edges(self._matrix(), self._number_nodes)
+        self._invalidate_indexes()
 
     def is_strict_partial_order(self) -> bool:
+        if self._maintain_closure:
+            # a relation is a strict partial order iff it equals its acyclic transitive closure
+            closure = self._get_closure()
+            return self._storage.is_irreflexive(
+                closure, self._number_nodes
+            ) and self._storage.equals(self._matrix(), closure, self._number_nodes)
         return self.is_irreflexive() and self.is_transitive()
 
     def get_start_nodes(self) -> TSet[T]:
-        return {
-            self._map_id_to_node[j]
-            for j in range(len(self.nodes))
-            if not any(self._edges[i][j] for i in range(len(self.nodes)))
-        }
+        if self._start_nodes is None:
+            predecessors, _ = self._get_indexes()
+            self._start_nodes = {
+                self._map_id_to_node[j]
+                for j in range(self._number_nodes)
+                if not predecessors[j]
+            }
+        return set(self._start_nodes)
 
     def get_end_nodes(self) -> TSet[T]:
-        return {
-            self._map_id_to_node[i]
-            for i in range(len(self.nodes))
-            if not any(self._edges[i][j] for j in range(len(self.nodes)))
-        }
+        if self._end_nodes is None:
+            _, successors = self._get_indexes()
+            self._end_nodes = {
+                self._map_id_to_node[i]
+                for i in range(self._number_nodes)
+                if not successors[i]
+            }
+        return set(self._end_nodes)
 
     def is_irreflexive(self) -> bool:
-        n = len(self.nodes)
-        for i in range(n):
-            if self.is_edge_id(i, i):
-                return False
-        return True
+        return self._storage.is_irreflexive(self._matrix(), self._number_nodes)
 
     def is_transitive(self) -> bool:
-        n = len(self.nodes)
-        for i, j, k in product(range(n), range(n), range(n)):
-            if (
-                self.is_edge_id(i, j)
-                and self.is_edge_id(j, k)
-                and not self.is_edge_id(i, k)
-            ):
-                return False
-        return True
+        if self._maintain_closure:
+            return self._storage.equals(
+                self._matrix(), self._get_closure(), self._number_nodes
+            )
+        return self._storage.is_transitive(self._matrix(), self._number_nodes)
 
     def __repr__(self) -> str:
         res = "(nodes = {  "
@@ -195,18 +269,36 @@ class BinaryRelation:
 
     @property
     def edges(self):
-        return self._edges
+        """
+        Read access to the adjacency matrix. Edges must be changed through ``add_edge`` and
+        ``remove_edge`` so that the closure and the adjacency indexes stay consistent.
+        """
+        return self._storage.read_only_view(self._edges, self._number_nodes)
 
     def get_preset(self, child):
-        res = set()
-        for node in self.nodes:
-            if self.is_edge(node, child):
-                res.add(node)
-        return res
+        predecessors, _ = self._get_indexes()
+        return {
+            self._map_id_to_node[i] for i in predecessors[self._map_node_to_id[child]]
+        }
 
     def get_postset(self, child):
-        res = set()
-        for node in self.nodes:
-            if self.is_edge(child, node):
-                res.add(node)
-        return res
+        _, successors = self._get_indexes()
+        return {
+            self._map_id_to_node[j] for j in successors[self._map_node_to_id[child]]
+        }
+
+    def get_preset_ids(self, j: int) -> TSet[int]:
+        predecessors, _ = self._get_indexes()
+        return set(predecessors[j])
+
+    def get_postset_ids(self, i: int) -> TSet[int]:
+        _, successors = self._get_indexes()
+        return set(successors[i])
+
+    def get_edge_ids(self) -> TList[Tuple[int, int]]:
+        """
+        All edges as pairs of node ids (the positions of the nodes), in row-major order. Unlike
+        iterating over pairs of nodes with ``is_edge``, this never hashes the nodes.
+        """
+        _, successors = self._get_indexes()
+        return [(i, j) for i in range(self._number_nodes) for j in sorted(successors[i])]
\ No newline at end of file
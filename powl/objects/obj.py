@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+from collections import deque
 from copy import deepcopy
+from threading import Lock
 from typing import List as TList, Optional, Union
 
 import networkx as nx
@@ -13,8 +15,23 @@ class POWL(ProcessTree, ABC):
     def simplify_using_frequent_transitions(self) -> "POWL":
         return self
 
+    def simplify(self, memo=None) -> "POWL":
+        """
+        Simplifies the model bottom-up. Every sub-model is simplified once per pass: the results are
+        memoized by node identity, which also avoids hashing the (recursively hashed) sub-models.
+
+        :param memo: sub-models already simplified in the current pass (internal)
+        """
+        if memo is None:
+            memo = {}
+        key = id(self)
+        if key not in memo:
+            # the node is kept alive in the memo so that its identity cannot be reused
+            memo[key] = (self, self._simplify(memo))
+        return memo[key][1]
+
     @abstractmethod
-    def simplify(self) -> "POWL":
+    def _simplify(self, memo) -> "POWL":
         return self
 
     def __str__(self):
@@ -27,6 +44,8 @@ class POWL(ProcessTree, ABC):
 
 class Transition(POWL):
     transition_id: int = 0
+    # identifiers define equality, so they must stay unique when models are built concurrently
+    _transition_id_lock = Lock()
 
     def __init__(
         self, label: Optional[str] = None, organization=None, role=None
@@ -35,8 +54,9 @@ class Transition(POWL):
         self._label = label
         self._organization = organization
         self._role = role
-        self._identifier = Transition.transition_id
-        Transition.transition_id = Transition.transition_id + 1
+        with Transition._transition_id_lock:
+            self._identifier = Transition.transition_id
+            Transition.transition_id = Transition.transition_id + 1
 
     def __repr__(self) -> str:
         return f"Transition(label={self._label}, id={self._identifier})"
@@ -80,7 +100,7 @@ class Transition(POWL):
     def simplify_using_frequent_transitions(self) -> "Transition":
         return self
 
-    def simplify(self) -> "Transition":
+    def _simplify(self, memo) -> "Transition":
         return self
 
     def reduce_silent_transitions(self, add_empty_paths=True) -> "Transition":
@@ -114,7 +134,7 @@ class FrequentTransition(Transition):
 
         super().__init__(label=label)
 
-    def simplify(self):
+    def _simplify(self, memo):
         raise Exception(
             "Not allowed! You cannot call the simplify function on powl models annotated with frequency tags."
         )
@@ -252,69 +272,47 @@ class StrictPartialOrder(POWL):
         }
         return self.map_nodes(new_nodes_map)
 
-    def simplify(self) -> "StrictPartialOrder":
-        simplified_nodes = {}
-        sub_nodes = {}
-        start_nodes = {}
-        end_nodes = {}
-
-        def connected(node):
-            for node2 in self.children:
-                if self.partial_order.is_edge(
-                    node, node2
-                ) or self.partial_order.is_edge(node2, node):
-                    return True
-            return False
-
-        for node_1 in self.children:
-            simplified_node = node_1.simplify()
+    def _simplify(self, memo) -> "StrictPartialOrder":
+        edges = self.order.get_edge_ids()
+        connected = set()
+        for i, j in edges:
+            connected.update((i, j))
+
+        # a simplified child that is a partial order is inlined if it is unconnected, or if it has
+        # a single start and a single end node through which it is connected
+        simplified = [node.simplify(memo) for node in self.children]
+        inlined = {}
+        for i, simplified_node in enumerate(simplified):
             if isinstance(simplified_node, StrictPartialOrder):
-
-                if not connected(node_1):
-                    sub_nodes[node_1] = simplified_node
+                sub_edges = simplified_node.order.get_edge_ids()
+                if i not in connected:
+                    inlined[i] = (sub_edges, None, None)
                 else:
-                    s_nodes = simplified_node.order.get_start_nodes()
-                    e_nodes = simplified_node.order.get_end_nodes()
-                    if len(s_nodes) == 1 and len(e_nodes) == 1:
-                        sub_nodes[node_1] = simplified_node
-                        start_nodes[node_1] = list(s_nodes)[0]
-                        end_nodes[node_1] = list(e_nodes)[0]
-                    else:
-                        simplified_nodes[node_1] = simplified_node
-            else:
-                simplified_nodes[node_1] = simplified_node
+                    ids = set(range(len(simplified_node.children)))
+                    s_ids = ids - {j for _, j in sub_edges}
+                    e_ids = ids - {j for j, _ in sub_edges}
+                    if len(s_ids) == 1 and len(e_ids) == 1:
+                        inlined[i] = (sub_edges, s_ids.pop(), e_ids.pop())
+
+        position = {}
+        new_nodes = []
+        for i, simplified_node in enumerate(simplified):
+            if i not in inlined:
+                position[i] = len(new_nodes)
+                new_nodes.append(simplified_node)
+        offset = {}
+        for i in inlined:
+            offset[i] = len(new_nodes)
+            new_nodes.extend(simplified[i].children)
 
-        new_nodes = list(simplified_nodes.values())
-        for po, simplified_po in sub_nodes.items():
-            new_nodes = new_nodes + list(simplified_po.children)
         res = StrictPartialOrder(new_nodes)
-        for node_1 in self.children:
-            for node_2 in self.children:
-                if self.partial_order.is_edge(node_1, node_2):
-                    if (
-                        node_1 in simplified_nodes.keys()
-                        and node_2 in simplified_nodes.keys()
-                    ):
-                        res.partial_order.add_edge(
-                            simplified_nodes[node_1], simplified_nodes[node_2]
-                        )
-                    elif node_1 in simplified_nodes.keys():
-                        res.partial_order.add_edge(
-                            simplified_nodes[node_1], start_nodes[node_2]
-                        )
-                    elif node_2 in simplified_nodes.keys():
-                        res.partial_order.add_edge(
-                            end_nodes[node_1], simplified_nodes[node_2]
-                        )
-                    else:
-                        res.partial_order.add_edge(
-                            end_nodes[node_1], start_nodes[node_2]
-                        )
-        for po, simplified_po in sub_nodes.items():
-            for node_1 in simplified_po.children:
-                for node_2 in simplified_po.children:
-                    if simplified_po.partial_order.is_edge(node_1, node_2):
-                        res.partial_order.add_edge(node_1, node_2)
+        for i, j in edges:
+            source = position[i] if i in position else offset[i] + inlined[i][2]
+            target = position[j] if j in position else offset[j] + inlined[j][1]
+            res.partial_order.add_edge_id(source, target)
+        for i, (sub_edges, _, _) in inlined.items():
+            for k, l in sub_edges:
+                res.partial_order.add_edge_id(offset[i] + k, offset[i] + l)
         return res
 
     def add_edge(self, source, target):
@@ -334,7 +332,7 @@ class Sequence(StrictPartialOrder):
         super().__init__(nodes)
         for i in range(len(nodes)):
             for j in range(i + 1, len(nodes)):
-                self.partial_order.add_edge(nodes[i], nodes[j])
+                self.partial_order.add_edge_id(i, j)
 
     def simplify_using_frequent_transitions(self) -> "StrictPartialOrder":
         new_children = []
@@ -456,7 +454,7 @@ class OperatorPOWL(POWL):
             [child.simplify_using_frequent_transitions() for child in self.children],
         )
 
-    def simplify(self) -> "OperatorPOWL":
+    def _simplify(self, memo) -> "OperatorPOWL":
         if self.operator is Operator.XOR and len(self.children) == 2:
             child_0 = self.children[0]
             child_1 = self.children[1]
@@ -469,12 +467,12 @@ class OperatorPOWL(POWL):
                 ):
                     if isinstance(child1.children[0], SilentTransition):
                         return OperatorPOWL(
-                            Operator.LOOP, [n.simplify() for n in child1.children]
+                            Operator.LOOP, [n.simplify(memo) for n in child1.children]
                         )
                     elif isinstance(child1.children[1], SilentTransition):
                         return OperatorPOWL(
                             Operator.LOOP,
-                            list(reversed([n.simplify() for n in child1.children])),
+                            list(reversed([n.simplify(memo) for n in child1.children])),
                         )
 
                 return None
@@ -488,7 +486,7 @@ class OperatorPOWL(POWL):
                 return res
 
         return OperatorPOWL(
-            self.operator, [child.simplify() for child in self.children]
+            self.operator, [child.simplify(memo) for child in self.children]
         )
 
 
@@ -536,7 +534,7 @@ class DecisionGraph(POWL):
     def __repr__(self):
         return f"DecisionGraph({self.children})"
 
-    def simplify(self) -> POWL:
+    def _simplify(self, memo) -> POWL:
         if len(self.children) == 1:
             child_0 = self.children[0]
             skippable = self.order.is_edge(self.start, self.end)
@@ -546,45 +544,46 @@ class DecisionGraph(POWL):
                 if repeatable:
                     return OperatorPOWL(
                         Operator.LOOP, [SilentTransition(), child_0]
-                    ).simplify()
+                    ).simplify(memo)
                 else:
                     if isinstance(child_0, DecisionGraph):
                         child_0.empty_path = True
                         child_0.order.add_edge(child_0.start, child_0.end)
-                        return child_0.simplify()
+                        return child_0.simplify(memo)
                     else:
                         return OperatorPOWL(
                             Operator.XOR, [SilentTransition(), child_0]
-                        ).simplify()
+                        ).simplify(memo)
 
             elif repeatable:
                 return OperatorPOWL(
                     Operator.LOOP, [child_0, SilentTransition()]
-                ).simplify()
+                ).simplify(memo)
 
             else:
-                return child_0.simplify()
-
-        else:
-            new_dg = self
+                return child_0.simplify(memo)
 
+        # the sequence-grouping rewrites are applied until none of them changes the graph; the
+        # children are only simplified once, when they are final
+        new_dg = self
+        while len(new_dg.children) > 1:
             seq = new_dg.__group_start_seq()
             if seq:
-                return seq.simplify()
+                return seq.simplify(memo)
 
             seq = new_dg.__group_end_seq()
             if seq:
-                return seq.simplify()
+                return seq.simplify(memo)
 
             res = new_dg.__group_pure_seq()
-            if len(res.children) < len(new_dg.children):
-                return res.simplify()
+            if res is new_dg:
+                new_children_map = {}
+                for child in new_dg.children:
+                    new_children_map[child] = child.simplify(memo)
+                return new_dg.__apply_mapping(new_children_map)
+            new_dg = res
 
-            new_children_map = {}
-            for child in new_dg.children:
-                s_child = child.simplify()
-                new_children_map[child] = s_child
-            return new_dg.__apply_mapping(new_children_map)
+        return new_dg.simplify(memo)
 
     def simplify_using_frequent_transitions(self) -> POWL:
         if len(self.children) == 1:
@@ -651,14 +650,19 @@ class DecisionGraph(POWL):
     def __apply_mapping(self, mapping, edges_to_remove=None) -> "DecisionGraph":
         if edges_to_remove is None:
             edges_to_remove = set()
-        res = BinaryRelation(list(set(mapping.values())))
-        for src in self.children:
-            for tgt in self.children:
-                if self.order.is_edge(src, tgt) and (src, tgt) not in edges_to_remove:
-                    new_src = mapping[src]
-                    new_tgt = mapping[tgt]
-                    if new_src != new_tgt or src == tgt:
-                        res.add_edge(new_src, new_tgt)
+        new_nodes = list(set(mapping.values()))
+        res = BinaryRelation(new_nodes)
+        # every child is resolved once, instead of looking up both ends of every candidate edge
+        position = {node: i for i, node in enumerate(new_nodes)}
+        mapped = [position[mapping[child]] for child in self.children]
+        n = len(self.children)
+        for src, tgt in self.order.get_edge_ids():
+            if src < n and tgt < n and (mapped[src] != mapped[tgt] or src == tgt):
+                if (
+                    not edges_to_remove
+                    or (self.children[src], self.children[tgt]) not in edges_to_remove
+                ):
+                    res.add_edge_id(mapped[src], mapped[tgt])
         new_start_nodes = list({mapping[child] for child in self.start_nodes})
         new_end_nodes = list({mapping[child] for child in self.end_nodes})
         empty_path = (
@@ -667,6 +671,24 @@ class DecisionGraph(POWL):
         )
         return DecisionGraph(res, new_start_nodes, new_end_nodes, empty_path)
 
+    def __child_ids(self, nodes):
+        index = {id(child): i for i, child in enumerate(self.children)}
+        return [index[id(node)] for node in nodes]
+
+    def __induced_graph(self, kept, start_ids, end_ids, empty_path) -> "DecisionGraph":
+        kept_set = set(kept)
+        position = {i: k for k, i in enumerate(kept)}
+        new_order = BinaryRelation([self.children[i] for i in kept])
+        for src, tgt in self.order.get_edge_ids():
+            if src in kept_set and tgt in kept_set:
+                new_order.add_edge_id(position[src], position[tgt])
+        return DecisionGraph(
+            new_order,
+            [self.children[i] for i in start_ids],
+            [self.children[i] for i in end_ids],
+            empty_path,
+        )
+
     def __create_mapping(self, old_children, new_child):
         mapping = {}
         for key in self.children:
@@ -703,74 +725,116 @@ class DecisionGraph(POWL):
     #     return new_dg
 
     def __group_pure_seq(self):
-        for child in list(self.children):
-            for child2 in self.children:
-                post1 = self.order.get_postset(child)
-                pre2 = self.order.get_preset(child2)
-                if pre2 == {child} and post1 == {child2}:
-                    seq = Sequence([child, child2])
-                    mapping = self.__create_mapping({child, child2}, seq)
-                    new_dg = self.__apply_mapping(mapping)
-                    return new_dg.__group_pure_seq()
-        return self
+        # a node whose only successor has it as only predecessor is merged with that successor into
+        # a sequence; the merges are done on the node ids, driven by a worklist
+        n = len(self.children)
+        nodes = list(self.children)
+        presets = [self.order.get_preset_ids(i) for i in range(n)]
+        postsets = [self.order.get_postset_ids(i) for i in range(n)]
+        merged_into = {}
+        worklist = deque(range(n))
+        while worklist:
+            child = worklist.popleft()
+            if child in merged_into or len(postsets[child]) != 1:
+                continue
+            child2 = next(iter(postsets[child]))
+            if child2 >= n or child2 == child or presets[child2] != {child}:
+                continue
+            nodes[child] = Sequence([nodes[child], nodes[child2]])
+            merged_into[child2] = child
+            postsets[child] = postsets[child2] - {child, child2}
+            presets[child].discard(child2)
+            for succ in postsets[child]:
+                if succ < n:
+                    presets[succ] = (presets[succ] - {child2}) | {child}
+            worklist.append(child)
+            worklist.extend(sorted(pre for pre in presets[child] if pre < n))
+
+        if not merged_into:
+            return self
+
+        def representative(i):
+            while i in merged_into:
+                i = merged_into[i]
+            return i
+
+        kept = [i for i in range(n) if i not in merged_into]
+        position = {i: k for k, i in enumerate(kept)}
+        new_order = BinaryRelation([nodes[i] for i in kept])
+        for i in kept:
+            for j in postsets[i]:
+                if j < n:
+                    new_order.add_edge_id(position[i], position[j])
+        start_ids = dict.fromkeys(representative(i) for i in self.__child_ids(self.start_nodes))
+        end_ids = dict.fromkeys(representative(i) for i in self.__child_ids(self.end_nodes))
+        return DecisionGraph(
+            new_order,
+            [nodes[i] for i in start_ids],
+            [nodes[i] for i in end_ids],
+            self.order.is_edge(self.start, self.end),
+        )
 
     def __group_start_seq(self):
-        start_list = []
-        current_dg = self
+        n = len(self.children)
+        removed = []
+        start_ids = self.__child_ids(self.start_nodes)
+        end_ids = self.__child_ids(self.end_nodes)
+        empty_path = self.order.is_edge(self.start, self.end)
+        # the single start node is peeled off as long as it has no predecessor but the start
         while (
-            len(current_dg.children) > 1
-            and len(current_dg.start_nodes) == 1
-            and not current_dg.order.is_edge(current_dg.start, current_dg.end)
-            and current_dg.order.get_preset(current_dg.start_nodes[0])
-            == {current_dg.start}
+            n - len(removed) > 1
+            and len(start_ids) == 1
+            and not empty_path
+            and all(
+                pre >= n or pre in removed
+                for pre in self.order.get_preset_ids(start_ids[0])
+            )
         ):
-            start = current_dg.start_nodes[0]
-            start_list.append(start)
-            postset = current_dg.order.get_postset(start)
-            new_start_nodes = list(postset - {current_dg.end})
-            new_children = [n for n in current_dg.children if n != start]
-            new_end_nodes = [n for n in current_dg.end_nodes if n != start]
-            new_order = BinaryRelation(new_children)
-            for c1 in new_children:
-                for c2 in new_children:
-                    if current_dg.order.is_edge(c1, c2):
-                        new_order.add_edge(c1, c2)
-            empty_path = current_dg.end in postset
-            current_dg = DecisionGraph(
-                new_order, new_start_nodes, new_end_nodes, empty_path
+            start = start_ids[0]
+            removed.append(start)
+            empty_path = start in end_ids
+            start_ids = sorted(
+                post
+                for post in self.order.get_postset_ids(start)
+                if post < n and post not in removed
             )
-        if len(start_list) > 0:
-            seq = Sequence(start_list + [current_dg])
+            end_ids = [i for i in end_ids if i != start]
+        if len(removed) > 0:
+            kept = [i for i in range(n) if i not in removed]
+            current_dg = self.__induced_graph(kept, start_ids, end_ids, empty_path)
+            seq = Sequence([self.children[i] for i in removed] + [current_dg])
             return seq
         return None
 
     def __group_end_seq(self):
-        end_list = []
-        current_dg = self
+        n = len(self.children)
+        removed = []
+        start_ids = self.__child_ids(self.start_nodes)
+        end_ids = self.__child_ids(self.end_nodes)
+        empty_path = self.order.is_edge(self.start, self.end)
+        # the single end node is peeled off as long as it has no successor but the end
         while (
-            len(current_dg.children) > 1
-            and len(current_dg.end_nodes) == 1
-            and not current_dg.order.is_edge(current_dg.start, current_dg.end)
-            and current_dg.order.get_postset(current_dg.end_nodes[0])
-            == {current_dg.end}
+            n - len(removed) > 1
+            and len(end_ids) == 1
+            and not empty_path
+            and all(
+                post >= n or post in removed
+                for post in self.order.get_postset_ids(end_ids[0])
+            )
         ):
-            end = current_dg.end_nodes[0]
-            end_list = [end] + end_list
-            pretset = current_dg.order.get_preset(end)
-            new_end_nodes = list(pretset - {current_dg.start})
-            new_children = [n for n in current_dg.children if n != end]
-            new_start_nodes = [n for n in current_dg.start_nodes if n != end]
-            new_order = BinaryRelation(new_children)
-            for c1 in new_children:
-                for c2 in new_children:
-                    if current_dg.order.is_edge(c1, c2):
-                        new_order.add_edge(c1, c2)
-            empty_path = current_dg.start in pretset
-            current_dg = DecisionGraph(
-                new_order, new_start_nodes, new_end_nodes, empty_path
+            end = end_ids[0]
+            removed = [end] + removed
+            empty_path = end in start_ids
+            end_ids = sorted(
+                pre
+                for pre in self.order.get_preset_ids(end)
+                if pre < n and pre not in removed
             )
-        if len(end_list) > 0:
-            seq = Sequence([current_dg] + end_list)
+            start_ids = [i for i in start_ids if i != end]
+        if len(removed) > 0:
+            kept = [i for i in range(n) if i not in removed]
+            current_dg = self.__induced_graph(kept, start_ids, end_ids, empty_path)
+            seq = Sequence([current_dg] + [self.children[i] for i in removed])
             return seq
         return None
 
@@ -0,0 +1,281 @@
+from copy import deepcopy
+from typing import Dict, Iterable, List as TList, Tuple
+
+from pm4py.objects.process_tree.obj import Operator
+
+from powl.objects.BinaryRelation import BinaryRelation
+from powl.objects.obj import (
+    DecisionGraph,
+    FrequentTransition,
+    OperatorPOWL,
+    POWL,
+    Sequence,
+    SilentTransition,
+    StrictPartialOrder,
+    Transition,
+)
+
+
+class POWLInterner:
+    """
+    Opt-in hash-consing of POWL models.
+
+    Every sub-model passed to the interner receives a canonical structural id: two sub-models get
+    the same id iff they are structurally equal (same labels, operators, children and orders, up to
+    the order in which the children of choices and partial orders are listed); the children of
+    partial orders and decision graphs are canonically labelled, so that isomorphic orders get the
+    same id. Interning a model
+    rebuilds it bottom-up so that structurally equal sub-models share one instance, which turns
+    equality and deduplication checks into O(1) identity or id comparisons.
+
+    Interned models are shared between all models interned by the same interner and must be treated
+    as immutable. Visualizers and converters that key on object identity expect every sub-model to
+    occur once, so pass a ``copy.deepcopy`` of an interned model to them.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[tuple, int] = {}
+        self._canonical: TList[POWL] = []
+        # id(model) -> (model, canonical id); the model is kept alive so that its id is not reused
+        self._memo: Dict[int, Tuple[POWL, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def structural_hash(self, model: POWL) -> int:
+        return self._intern(model)
+
+    def intern(self, model: POWL) -> POWL:
+        return self._canonical[self._intern(model)]
+
+    def equal(self, model_1: POWL, model_2: POWL) -> bool:
+        return self._intern(model_1) == self._intern(model_2)
+
+    def deduplicate(self, models: Iterable[POWL]) -> TList[POWL]:
+        seen = set()
+        res = []
+        for model in models:
+            canonical_id = self._intern(model)
+            if canonical_id not in seen:
+                seen.add(canonical_id)
+                res.append(self._canonical[canonical_id])
+        return res
+
+    def _intern(self, model: POWL) -> int:
+        entry = self._memo.get(id(model))
+        if entry is not None:
+            return entry[1]
+
+        if isinstance(model, Transition):
+            key = self._transition_key(model)
+            children, build = [], lambda: model
+        elif isinstance(model, OperatorPOWL):
+            key, children, build = self._operator_key(model)
+        elif isinstance(model, StrictPartialOrder):
+            key, children, build = self._partial_order_key(model)
+        elif isinstance(model, DecisionGraph):
+            key, children, build = self._decision_graph_key(model)
+        else:
+            raise Exception("Unsupported POWL type!")
+
+        canonical_id = self._ids.get(key)
+        if canonical_id is None:
+            canonical_id = len(self._canonical)
+            self._ids[key] = canonical_id
+            if self._has_canonical_children(children):
+                # the model itself becomes the shared instance
+                self._canonical.append(model)
+            else:
+                self._canonical.append(build())
+        self._memo[id(model)] = (model, canonical_id)
+        return canonical_id
+
+    def _has_canonical_children(self, children: TList[POWL]) -> bool:
+        return len({id(child) for child in children}) == len(children) and all(
+            child is self._canonical[self._intern(child)] for child in children
+        )
+
+    @staticmethod
+    def _transition_key(model: Transition) -> tuple:
+        if isinstance(model, SilentTransition):
+            return ("tau",)
+        if isinstance(model, FrequentTransition):
+            return (
+                "frequent",
+                model.activity,
+                model.skippable,
+                model.selfloop,
+                model._organization,
+                model._role,
+            )
+        return ("activity", model.label, model._organization, model._role)
+
+    def _canonical_children(self, children: TList[POWL]) -> TList[POWL]:
+        # a node can occur only once in a binary relation, so repeated children get private copies
+        res = []
+        used = set()
+        for child in children:
+            canonical = self._canonical[self._intern(child)]
+            if id(canonical) in used:
+                canonical = deepcopy(canonical)
+            used.add(id(canonical))
+            res.append(canonical)
+        return res
+
+    def _operator_key(self, model: OperatorPOWL):
+        children = list(model.children)
+        ids = [self._intern(child) for child in children]
+        if model.operator is Operator.LOOP:
+            order = list(range(len(children)))
+        else:
+            order = sorted(range(len(children)), key=lambda i: ids[i])
+        key = ("operator", model.operator, tuple(ids[i] for i in order))
+
+        def build():
+            return OperatorPOWL(
+                model.operator,
+                self._canonical_children([children[i] for i in order]),
+            )
+
+        return key, children, build
+
+    def _partial_order_key(self, model: StrictPartialOrder):
+        children = list(model.children)
+        relation = model.order
+        order, edges = self._canonical_order(children, relation)
+        tag = "sequence" if isinstance(model, Sequence) else "partial_order"
+        key = (tag, tuple(self._intern(children[i]) for i in order), edges)
+
+        def build():
+            new_children = self._canonical_children([children[i] for i in order])
+            if isinstance(model, Sequence):
+                return Sequence(new_children)
+            res = StrictPartialOrder(new_children)
+            for i, j in edges:
+                res.order.add_edge(new_children[i], new_children[j])
+            return res
+
+        return key, children, build
+
+    def _decision_graph_key(self, model: DecisionGraph):
+        children = list(model.children)
+        relation = model.order
+        start_nodes = set(model.start_nodes)
+        end_nodes = set(model.end_nodes)
+        order, edges = self._canonical_order(
+            children,
+            relation,
+            [(child in start_nodes, child in end_nodes) for child in children],
+        )
+        position = {children[i]: p for p, i in enumerate(order)}
+        start_nodes = tuple(sorted(position[node] for node in model.start_nodes))
+        end_nodes = tuple(sorted(position[node] for node in model.end_nodes))
+        empty_path = relation.is_edge(model.start, model.end)
+        key = (
+            "decision_graph",
+            tuple(self._intern(children[i]) for i in order),
+            edges,
+            start_nodes,
+            end_nodes,
+            empty_path,
+        )
+
+        def build():
+            new_children = self._canonical_children([children[i] for i in order])
+            new_order = BinaryRelation(new_children)
+            for i, j in edges:
+                new_order.add_edge(new_children[i], new_children[j])
+            return DecisionGraph(
+                new_order,
+                [new_children[i] for i in start_nodes],
+                [new_children[i] for i in end_nodes],
+                empty_path=empty_path,
+            )
+
+        return key, children, build
+
+    def _canonical_order(
+        self, children: TList[POWL], relation: BinaryRelation, labels=None
+    ):
+        """
+        Canonical labelling of the children: they are colored by their canonical ids (and the given
+        labels), and the colors are refined by the colors of the direct predecessors and successors
+        until they are stable. Ties are broken by individualizing each child of the first color
+        class that is not a singleton in turn, and the labelling with the smallest edge tuple is
+        kept. Children with the same color and the same predecessors and successors can be swapped
+        without changing the edges, so only one of them is individualized.
+
+        :param labels: additional labels of the children that must be preserved (e.g. whether they
+            are start or end nodes)
+        :return: the order of the children and the edges between them as sorted pairs of positions
+            in this order
+        """
+        n = len(children)
+        ids = [self._intern(child) for child in children]
+        index = {child: i for i, child in enumerate(children)}
+        preds = [set() for _ in children]
+        succs = [set() for _ in children]
+        for i, child in enumerate(children):
+            for target in relation.get_postset(child):
+                j = index.get(target)
+                if j is not None:
+                    succs[i].add(j)
+                    preds[j].add(i)
+
+        def rank(keys):
+            values = {key: r for r, key in enumerate(sorted(set(keys)))}
+            return [values[key] for key in keys]
+
+        def refine(colors):
+            num_colors = len(set(colors))
+            while True:
+                colors = rank(
+                    [
+                        (
+                            colors[i],
+                            tuple(sorted(colors[p] for p in preds[i])),
+                            tuple(sorted(colors[s] for s in succs[i])),
+                        )
+                        for i in range(n)
+                    ]
+                )
+                if len(set(colors)) == num_colors:
+                    return colors
+                num_colors = len(set(colors))
+
+        def search(colors):
+            classes = {}
+            for i, color in enumerate(colors):
+                classes.setdefault(color, []).append(i)
+            ties = [
+                members for _, members in sorted(classes.items()) if len(members) > 1
+            ]
+            if not ties:
+                order = sorted(range(n), key=lambda i: colors[i])
+                position = {i: p for p, i in enumerate(order)}
+                edges = tuple(
+                    sorted(
+                        (position[i], position[j]) for i in range(n) for j in succs[i]
+                    )
+                )
+                return edges, order
+            tied = ties[0]
+            best = None
+            seen = []
+            for v in tied:
+                if any(preds[v] == preds[u] and succs[v] == succs[u] for u in seen):
+                    continue
+                seen.append(v)
+                individualized = [
+                    2 * color + (1 if color == colors[v] and i != v else 0)
+                    for i, color in enumerate(colors)
+                ]
+                candidate = search(refine(individualized))
+                if best is None or candidate[0] < best[0]:
+                    best = candidate
+            return best
+
+        if labels is None:
+            labels = [None] * n
+        edges, order = search(refine(rank([(ids[i], labels[i]) for i in range(n)])))
+        return order, edges
@@ -0,0 +1,258 @@
+from enum import auto, Enum
+from itertools import product
+
+import numpy as np
+
+
+class RelationBackend(Enum):
+    LIST = auto()  # list-of-lists of booleans with the original triple loops
+    NUMPY = auto()  # dense NumPy boolean matrix with vectorized algorithms
+
+
+class ListStorage:
+    """
+    Reference storage engine: the adjacency matrix is a Python list of lists of booleans and all
+    algorithms are the original pure-Python loops.
+    """
+
+    @staticmethod
+    def empty(n: int):
+        return [[False for _ in range(n)] for _ in range(n)]
+
+    @staticmethod
+    def copy(edges):
+        return [list(row) for row in edges]
+
+    @staticmethod
+    def view(edges, n: int):
+        return edges
+
+    @staticmethod
+    def read_only_view(edges, n: int):
+        return tuple(tuple(row) for row in edges)
+
+    @staticmethod
+    def grow(edges, n: int, new_n: int):
+        # rows are extended in place, so adding a node costs O(n) instead of copying the matrix
+        del edges[n:]
+        for row in edges:
+            del row[n:]
+            row.extend(False for _ in range(new_n - n))
+        edges.extend([False for _ in range(new_n)] for _ in range(new_n - n))
+        return edges
+
+    @staticmethod
+    def add_transitive_edges(edges, n: int) -> None:
+        changed = True
+        while changed:
+            changed = False
+            for i, j, k in product(range(n), range(n), range(n)):
+                if (
+                    i != j
+                    and j != k
+                    and edges[i][j]
+                    and edges[j][k]
+                    and not edges[i][k]
+                ):
+                    edges[i][k] = True
+                    changed = True
+
+    @staticmethod
+    def transitive_reduction(edges, n: int):
+        tc = ListStorage.copy(edges)
+        ListStorage.add_transitive_edges(tc, n)
+        tr = ListStorage.copy(edges)
+        for i, j, k in product(range(n), range(n), range(n)):
+            if i != j and j != k and tc[i][j] and tc[j][k] and tc[i][k]:
+                tr[i][k] = False
+        return tr
+
+    @staticmethod
+    def remove_transitivity_violations(edges, n: int) -> None:
+        changed = True
+        while changed:
+            changed = False
+            for i, j, k in product(range(n), range(n), range(n)):
+                if (
+                    i != j
+                    and j != k
+                    and edges[i][j]
+                    and edges[j][k]
+                    and not edges[i][k]
+                ):
+                    edges[j][k] = False
+                    changed = True
+
+    @staticmethod
+    def transitive_closure(edges, n: int):
+        closure = ListStorage.copy(edges)
+        ListStorage.add_transitive_edges(closure, n)
+        return closure
+
+    @staticmethod
+    def add_to_closure(closure, n: int, i: int, j: int) -> None:
+        if closure[i][j]:
+            return
+        sources = [s for s in range(n) if s == i or closure[s][i]]
+        targets = [t for t in range(n) if t == j or closure[j][t]]
+        for s in sources:
+            for t in targets:
+                closure[s][t] = True
+
+    @staticmethod
+    def closure_survives_removal(edges, closure, n: int, i: int, j: int) -> bool:
+        return any(
+            edges[i][k] and closure[k][j] and not closure[k][i] for k in range(n)
+        )
+
+    @staticmethod
+    def equals(edges, other, n: int) -> bool:
+        return all(edges[i][j] == other[i][j] for i in range(n) for j in range(n))
+
+    @staticmethod
+    def is_irreflexive(edges, n: int) -> bool:
+        for i in range(n):
+            if edges[i][i]:
+                return False
+        return True
+
+    @staticmethod
+    def is_transitive(edges, n: int) -> bool:
+        for i, j, k in product(range(n), range(n), range(n)):
+            if edges[i][j] and edges[j][k] and not edges[i][k]:
+                return False
+        return True
+
+    @staticmethod
+    def edge_ids(edges, n: int):
+        return [(i, j) for i in range(n) for j in range(n) if edges[i][j]]
+
+
+class NumpyStorage:
+    """
+    Compact storage engine: the adjacency matrix is a NumPy boolean array whose capacity grows
+    geometrically, the relation itself being its leading n x n block. The transitive closure is
+    computed with a row-vectorized Warshall algorithm and the transitivity checks and the transitive
+    reduction use a single boolean matrix product.
+    """
+
+    MIN_CAPACITY = 8
+
+    @staticmethod
+    def empty(n: int):
+        return np.zeros((n, n), dtype=bool)
+
+    @staticmethod
+    def copy(edges):
+        return edges.copy()
+
+    @staticmethod
+    def view(edges, n: int):
+        return edges[:n, :n]
+
+    @staticmethod
+    def read_only_view(edges, n: int):
+        view = edges[:n, :n]
+        view.flags.writeable = False
+        return view
+
+    @staticmethod
+    def grow(edges, n: int, new_n: int):
+        capacity = edges.shape[0]
+        if new_n <= capacity:
+            edges[n:new_n, :new_n] = False
+            edges[:new_n, n:new_n] = False
+            return edges
+        new_capacity = max(new_n, 2 * capacity, NumpyStorage.MIN_CAPACITY)
+        new_edges = NumpyStorage.empty(new_capacity)
+        new_edges[:n, :n] = edges[:n, :n]
+        return new_edges
+
+    @staticmethod
+    def _product(a, b):
+        # float32 products go through BLAS and are exact for any realistic number of nodes
+        return (a.astype(np.float32) @ b.astype(np.float32)) > 0
+
+    @staticmethod
+    def add_transitive_edges(edges, n: int) -> None:
+        for k in range(n):
+            rows = edges[:, k]
+            if rows.any():
+                edges[rows] |= edges[k]
+
+    @staticmethod
+    def transitive_reduction(edges, n: int):
+        tc = edges.copy()
+        NumpyStorage.add_transitive_edges(tc, n)
+        # a pair (i, k) is redundant if i -> j -> k in the closure for some j distinct from i and k
+        np.fill_diagonal(tc, False)
+        return edges & ~NumpyStorage._product(tc, tc)
+
+    @staticmethod
+    def remove_transitivity_violations(edges, n: int) -> None:
+        off_diagonal = ~np.eye(n, dtype=bool)
+        # (j, k) violates transitivity if i -> j -> k but not i -> k for some i != j
+        missing = NumpyStorage._product((edges & off_diagonal).T, ~edges)
+        if not (missing & edges & off_diagonal).any():
+            return
+        # removing an edge can resolve later violations, so the edges are removed in the order of
+        # the triples (i, j, k) as in ListStorage; only row i is read and row j written for a pair
+        # (i, j), so the removals over k are applied at once
+        changed = True
+        while changed:
+            changed = False
+            for i in range(n):
+                not_successors = ~edges[i]
+                for j in np.flatnonzero(edges[i]):
+                    if j == i:
+                        continue
+                    violations = edges[j] & not_successors
+                    violations[j] = False
+                    if violations.any():
+                        edges[j] &= ~violations
+                        changed = True
+
+    @staticmethod
+    def transitive_closure(edges, n: int):
+        closure = edges.copy()
+        NumpyStorage.add_transitive_edges(closure, n)
+        return closure
+
+    @staticmethod
+    def add_to_closure(closure, n: int, i: int, j: int) -> None:
+        if closure[i, j]:
+            return
+        sources = closure[:, i].copy()
+        sources[i] = True
+        targets = closure[j].copy()
+        targets[j] = True
+        closure[sources] |= targets
+
+    @staticmethod
+    def closure_survives_removal(edges, closure, n: int, i: int, j: int) -> bool:
+        return bool((edges[i] & closure[:, j] & ~closure[:, i]).any())
+
+    @staticmethod
+    def equals(edges, other, n: int) -> bool:
+        return np.array_equal(edges, other)
+
+    @staticmethod
+    def is_irreflexive(edges, n: int) -> bool:
+        return not edges.diagonal().any()
+
+    @staticmethod
+    def is_transitive(edges, n: int) -> bool:
+        return not (NumpyStorage._product(edges, edges) & ~edges).any()
+
+    @staticmethod
+    def edge_ids(edges, n: int):
+        return np.argwhere(edges).tolist()
+
+
+def get_storage(backend: RelationBackend):
+    if backend is RelationBackend.LIST:
+        return ListStorage
+    elif backend is RelationBackend.NUMPY:
+        return NumpyStorage
+    else:
+        raise Exception("Invalid relation backend!")
@@ -0,0 +1,23 @@
+from powl.objects.obj import StrictPartialOrder, Transition
+from powl.objects.utils.interning import POWLInterner
+
+
+def _matching(child_order):
+    nodes = [Transition("A"), Transition("A"), Transition("B"), Transition("B")]
+    a_1, a_2, b_1, b_2 = nodes
+    model = StrictPartialOrder([nodes[i] for i in child_order])
+    model.order.add_edge(a_1, b_1)
+    model.order.add_edge(a_2, b_2)
+    return model
+
+
+def test_isomorphic_partial_orders_share_an_id():
+    # the two A's (and B's) have the same signature, ties must not follow the order
+    model_1 = _matching([0, 1, 2, 3])
+    model_2 = _matching([0, 1, 3, 2])
+    assert model_1.equal_content(model_2)
+
+    interner = POWLInterner()
+    assert interner.equal(model_1, model_2)
+    assert interner.intern(model_1) is interner.intern(model_2)
+    assert len(interner.deduplicate([model_1, model_2])) == 1
@@ -0,0 +1,44 @@
+import random
+
+from powl.objects.BinaryRelation import BinaryRelation
+from powl.objects.utils.relation_backends import RelationBackend
+
+
+def _relation(n, edges, backend):
+    relation = BinaryRelation(list(range(n)), backend=backend)
+    for i, j in edges:
+        relation.add_edge(i, j)
+    return relation
+
+
+def _remove_edge(n, edges, removed, backend):
+    relation = _relation(n, edges, backend)
+    relation.remove_edge_without_violating_transitivity(*removed)
+    return sorted(tuple(edge) for edge in relation.get_edge_ids())
+
+
+def test_remove_edge_without_violating_transitivity_matches_list_backend():
+    # removing (1, 2) resolves the violation 0 -> 2 -> 3, so (2, 3) is kept
+    edges = [(0, 1), (0, 2), (1, 2), (2, 3)]
+    assert _remove_edge(4, edges, (0, 2), RelationBackend.NUMPY) == [(0, 1), (2, 3)]
+
+    rng = random.Random(0)
+    for _ in range(500):
+        n = rng.randint(1, 8)
+        edges = [(i, j) for i in range(n) for j in range(n) if rng.random() < 0.35]
+        if not edges:
+            continue
+        removed = rng.choice(edges)
+        assert _remove_edge(n, edges, removed, RelationBackend.LIST) == _remove_edge(
+            n, edges, removed, RelationBackend.NUMPY
+        )
+
+
+def test_edges_are_read_only():
+    for backend in RelationBackend:
+        relation = _relation(2, [(0, 1)], backend)
+        try:
+            relation.edges[1][0] = True
+        except (TypeError, ValueError):
+            pass
+        assert not relation.is_edge(1, 0)